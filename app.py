@@ -1,31 +1,45 @@
-from flask import Flask, render_template, request, jsonify, send_file
-import pandas as pd
+from flask import Flask, render_template, request, jsonify, send_file, Response, stream_with_context
 import os
+import json
 from datetime import datetime
 import time
 import random
-import requests
-from bs4 import BeautifulSoup
 import urllib.parse
 import re
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 import argparse
 from shutil import which
-from gemini_analyzer import GeminiAnalyzer
-from pathlib import Path
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from job_queue import JobStore, JobQueue, QueueFullError
+from recognizers import find_emails
+from records import BusinessRecord, CsvRecordSink, select_columns, COLUMNS, SITEMAP_COLUMNS
+from normalizers import normalize_record
+from settings import (
+    HTTP_CACHE_ENABLED, GOLDEN_PAGES_BASE_URL, DOWNLOADS_DIR, SEARCH_CACHE_TTL, RENDER_FALLBACK,
+    SEARCH_PAGE_LOOKAHEAD, SITEMAP_MAX_BUSINESSES, JOB_EVENTS_STREAM_SECONDS, JOURNAL_RETENTION
+)
+from exports import FORMATS, find_export, choose_encoding, iter_file, iter_ndjson, compress
+from driver_pool import get_driver_pool, wait_for_element, wait_for_page_load
+from extract_pool import get_extract_pool
+from journal import ScrapeJournal, sweep_journals
+from sitemap import iter_sitemap, SITEMAP
+from frontier import SeenUrls, UrlFrontier, ScratchDir, sweep_scratch_dirs
+from render_policy import RenderPolicy, SEARCH_PAGE, DETAIL_PAGE, BROWSER, HTTP, has_markers
+
+# Heavy dependencies (requests/httpx, bs4/lxml, pandas, selenium and
+# google.generativeai) are imported where they are first used, so a gunicorn
+# worker that only serves pages and downloads never loads them.
 
 app = Flask(__name__)
 
 class GoldenPagesScraper:
-    def __init__(self):
-        self.base_url = "https://www.goldenpages.ie"
+    def __init__(self, base_url=None):
+        import requests
+        from fetch_engine import get_fetch_engine
+        from http_cache import HttpCache
+        
+        # Defaults to the live site; pass a replay_server.py URL to run offline
+        self.base_url = (base_url or GOLDEN_PAGES_BASE_URL).rstrip('/')
         self.session = requests.Session()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -39,33 +53,35 @@ class GoldenPagesScraper:
         }
         self.session.headers.update(self.headers)
         
-        # Optional Selenium WebDriver initialization
-        self.driver = None
-        try:
-            # Initialize Chrome options for dynamic content
-            chrome_options = Options()
-            chrome_options.add_argument('--headless')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--window-size=1920,1080')
-            
-            # Try to initialize WebDriver
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            print("Selenium WebDriver initialized successfully.")
-        except Exception as e:
-            print(f"Could not initialize Selenium WebDriver. Falling back to requests-based scraping: {e}")
+        # Headless Chrome comes from a shared pool and is only started when a
+        # page actually needs rendering (see fetch_page)
+        self.driver_pool = get_driver_pool()
+        self.render_policy = RenderPolicy() if RENDER_FALLBACK else None
+        
+        # Detail pages are parsed in worker processes shared by every scrape
+        # in this process (see iter_business_details)
+        self.extract_pool = get_extract_pool()
         
-        # Initialize rate limiting
+        # Initialize rate limiting. Requests go through the process-wide fetch
+        # engine, whose per-host token bucket enforces the interval.
+        self.fetch_engine = get_fetch_engine()
+        self.prefetched = set()  # URLs this scraper asked the engine to download ahead
         self.last_request_time = 0
-        self.min_request_interval = 2  # seconds
+        self.min_request_interval = self.fetch_engine.engine.min_interval  # seconds
+
+        # Persistent HTTP cache shared by all scrapers on this host
+        self.http_cache = HttpCache() if HTTP_CACHE_ENABLED else None
+        self.revalidate_cache = False  # Revalidate even fresh entries, for forced refreshes
 
         # Initialize progress tracking
         self.total_processed = 0
         self.successful_scrapes = 0
         self.failed_scrapes = 0
         self.start_time = time.time()
+        self.current_page = 0
+        self.total_count = 0
+        self.progress_callback = None  # Called with a progress dict whenever progress changes
+        self.stage_times = defaultdict(float)  # Seconds spent in fetch/parse/extract/write during a scrape
 
         # Initialize proxy support (disabled by default)
         self.proxies = []  # Empty list means no proxies
@@ -93,18 +109,10 @@ class GoldenPagesScraper:
         ]
         
         # Set up downloads directory
-        self.downloads_dir = str(Path.home() / "Downloads")
+        self.downloads_dir = DOWNLOADS_DIR
         if not os.path.exists(self.downloads_dir):
             os.makedirs(self.downloads_dir)
 
-    def __del__(self):
-        # Safely close the WebDriver if it exists
-        if hasattr(self, 'driver') and self.driver:
-            try:
-                self.driver.quit()
-            except Exception as e:
-                print(f"Error closing WebDriver: {e}")
-
     def rotate_proxy(self):
         """Rotate to next proxy if enabled."""
         if self.use_proxies and self.proxies:
@@ -119,43 +127,172 @@ class GoldenPagesScraper:
             self.session.proxies = {}  # Clear any existing proxies
 
     def wait_for_rate_limit(self):
-        """Wait to respect rate limiting."""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        if time_since_last_request < self.min_request_interval:
-            time.sleep(self.min_request_interval - time_since_last_request)
+        """Wait for a slot from the fetch engine's per-host token bucket."""
+        self.fetch_engine.wait(self.base_url)
         self.last_request_time = time.time()
 
+    def current_proxy(self):
+        """Proxy URL selected by rotate_proxy(), if any."""
+        return self.session.proxies.get('https') if self.session.proxies else None
+
+    def request_headers(self, cached=None):
+        """Browser-like request headers, made conditional when a stale cache entry exists."""
+        # Add more headers to mimic browser
+        headers = self.headers.copy()
+        headers['Referer'] = self.base_url
+        headers['Origin'] = self.base_url
+        
+        # Revalidate stale cache entries instead of refetching them
+        if cached:
+            headers.update(cached.conditional_headers())
+        return headers
+
+    def prefetch(self, urls):
+        """
+        Start downloading URLs in the background.
+        
+        A later make_request_with_retry() for the same URL picks up the
+        in-flight response instead of issuing a new request. URLs that are
+        fresh in the HTTP cache, or that are rendered in Chrome anyway, are
+        skipped.
+        """
+        for url in urls:
+            if self.render_policy and self.render_policy.mode(url) == BROWSER:
+                continue
+            cached = self.http_cache.get(url) if self.http_cache else None
+            if self.serves_from_cache(cached):
+                continue
+            self.fetch_engine.prefetch([url], self.request_headers(cached), self.current_proxy())
+            self.prefetched.add(url)
+
+    def cancel_prefetches(self):
+        """
+        Drop downloads started by prefetch() that were never collected.
+        
+        A scrape that stops early (an error, a business limit, a county
+        filter) would otherwise leave them holding the engine's shared
+        prefetch slots until they expire.
+        """
+        for url in self.prefetched:
+            self.fetch_engine.discard(url)  # No-op for responses already used
+        self.prefetched.clear()
+
+    def render_page(self, url, wait_for=None):
+        """
+        Load a page in a pooled headless Chrome and return the rendered HTML.
+        
+        Args:
+            url (str): Page to load
+            wait_for (str, optional): CSS selector that marks the content as rendered.
+                If it never appears (e.g. an empty search) the page is returned as loaded.
+        """
+        from selenium.common.exceptions import TimeoutException
+        
+        with self.timed('render'), self.driver_pool.driver() as driver:
+            driver.get(url)
+            if wait_for:
+                try:
+                    wait_for_element(driver, wait_for)
+                except TimeoutException:
+                    print(f"{wait_for} never appeared on {url}")
+            return driver.page_source
+
+    def fetch_page(self, url, markers):
+        """
+        Fetch a page over HTTP, rendering it in headless Chrome only when needed.
+        
+        The static HTML is used when it contains one of the page's markers.
+        Otherwise the page is rendered, and if that copy has the markers the
+        URL's pattern is remembered as browser-only, so later pages like it
+        skip the HTTP request. Pages that lack the markers either way (e.g. an
+        empty search) are returned as fetched.
+        
+        Args:
+            url (str): Page to fetch
+            markers (PageMarkers): What a complete page of this kind contains
+            
+        Returns:
+            requests.Response or None
+        """
+        if self.render_policy and self.render_policy.mode(url) == BROWSER:
+            rendered = self.fetch_rendered(url, markers)
+            if rendered is not None:
+                return rendered
+        
+        response = self.make_request_with_retry(url)
+        if not response or not self.render_policy:
+            return response
+        if has_markers(response.content, markers):
+            self.render_policy.remember(url, HTTP)
+            return response
+        
+        print(f"Static HTML of {url} looks incomplete, rendering it in Chrome")
+        rendered = self.fetch_rendered(url, markers)
+        if rendered is None:
+            return response
+        self.render_policy.remember(url, BROWSER)
+        return rendered
+
+    def fetch_rendered(self, url, markers):
+        """Render a page in Chrome and return it as a response, or None if it never showed the markers."""
+        from http_cache import build_response
+        
+        try:
+            self.wait_for_rate_limit()  # Chrome's page load counts against the host's rate too
+            html = self.render_page(url, wait_for=markers.wait_for)
+        except Exception as e:
+            print(f"Rendering failed for {url}: {e}")
+            return None
+        return build_response(url, 200, {'content-type': 'text/html; charset=utf-8'}, html.encode('utf-8'))
+
+    def serves_from_cache(self, cached):
+        """Whether a cache entry can be used without asking the server."""
+        return bool(cached) and not self.revalidate_cache and cached.is_fresh(self.http_cache.ttl)
+
     def make_request_with_retry(self, url, max_retries=3):
-        """Make request with retry logic."""
+        """Make request with retry logic, serving and revalidating from the HTTP cache."""
+        import requests
+        
+        cached = self.http_cache.get(url) if self.http_cache else None
+        if self.serves_from_cache(cached):
+            print(f"Cache hit: {url}")
+            return cached.to_response()
+            
         for attempt in range(max_retries):
             try:
-                self.wait_for_rate_limit()
                 print(f"Attempt {attempt + 1}: Requesting URL: {url}")
                 
-                # Add more headers to mimic browser
-                headers = self.headers.copy()
-                headers['Referer'] = self.base_url
-                headers['Origin'] = self.base_url
-                
-                response = self.session.get(url, headers=headers, timeout=15)
+                # The fetch engine waits for the host's rate limit before sending
+                with self.timed('fetch'):
+                    response = self.fetch_engine.get(url, self.request_headers(cached), self.current_proxy())
+                self.last_request_time = time.time()
                 
                 print(f"Response status: {response.status_code}")
                 
+                if response.status_code == 304 and cached:
+                    print(f"Cache revalidated: {url}")
+                    self.http_cache.refresh(url, response)
+                    return cached.to_response()
+                
                 if response.ok:
                     # Log response content length for debugging
                     print(f"Response content length: {len(response.content)} bytes")
+                    if self.http_cache and response.status_code == 200:
+                        self.http_cache.store(url, response)
                     return response
                 
+                if response.status_code in (404, 410):  # Gone - retrying won't help
+                    return None
+                
                 if response.status_code == 403:  # Forbidden - likely IP block
                     print("Received 403 Forbidden. Rotating proxy...")
                     self.rotate_proxy()
                 
+                # No fixed sleeps: the fetch engine's rate controller has already
+                # slowed this host down (and honours any Retry-After), so the
+                # next attempt waits exactly as long as the host asked for.
                 if response.status_code == 429:  # Too Many Requests
-                    print("Rate limited. Waiting before retry...")
-                    time.sleep(5 * (attempt + 1))
-                
-                time.sleep((attempt + 1) * 2)  # Exponential backoff
+                    print("Rate limited. Retrying when the host allows...")
             
             except requests.exceptions.RequestException as e:
                 print(f"Request failed (attempt {attempt + 1}/{max_retries}): {e}")
@@ -169,10 +306,18 @@ class GoldenPagesScraper:
                     raise
                 
                 self.rotate_proxy()  # Try a different proxy
-                time.sleep((attempt + 1) * 2)
         
         return None
 
+    @contextmanager
+    def timed(self, stage):
+        """Add the time spent inside the block to stage_times[stage]."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_times[stage] += time.perf_counter() - started
+
     def update_progress(self, success=True):
         """Update progress metrics."""
         self.total_processed += 1
@@ -180,10 +325,33 @@ class GoldenPagesScraper:
             self.successful_scrapes += 1
         else:
             self.failed_scrapes += 1
+        progress = self.report_progress()
+        print(f"Processed: {self.total_processed}, Success: {self.successful_scrapes}, "
+              f"Failed: {self.failed_scrapes}, Rate: {progress['rate']:.2f}/s")
+
+    def report_progress(self):
+        """Build a progress snapshot and pass it to the progress callback, if any."""
         elapsed_time = time.time() - self.start_time
         rate = self.total_processed / elapsed_time if elapsed_time > 0 else 0
-        print(f"Processed: {self.total_processed}, Success: {self.successful_scrapes}, "
-              f"Failed: {self.failed_scrapes}, Rate: {rate:.2f}/s")
+        remaining = max(self.total_count - self.total_processed, 0)
+        progress = {
+            'page': self.current_page,
+            'found': self.successful_scrapes,
+            'processed': self.total_processed,
+            'failed': self.failed_scrapes,
+            'total_count': self.total_count,
+            'rate': rate,
+            'eta_seconds': round(remaining / rate) if rate > 0 else None,
+            'elapsed_seconds': round(elapsed_time)
+        }
+        
+        if self.progress_callback:
+            try:
+                self.progress_callback(progress)
+            except Exception as e:
+                print(f"Error reporting progress: {e}")
+                
+        return progress
 
     def validate_business_data(self, data):
         """Validate scraped business data."""
@@ -204,133 +372,105 @@ class GoldenPagesScraper:
 
     def extract_business_details(self, business_url, county):
         """Extract detailed business information from a specific business page."""
+        from extractors import extract_details
+
         try:
-            print("\n" + "="*50)
-            print(f"Processing business at: {business_url}")
-            
-            response = self.make_request_with_retry(business_url)
+            response = self.fetch_business_page(business_url)
             if not response:
                 return {}
 
-            soup = BeautifulSoup(response.content, 'lxml')
-            details = {}
-            
-            # Extract business name
-            business_name = soup.find('h1')
-            if business_name:
-                details['name'] = business_name.text.strip()
-                print(f"Found business name: {details['name']}")
-
-            # Extract phone numbers
-            phone_patterns = [
-                ('a', {'href': lambda x: x and 'tel:' in x}),
-                (['span', 'div', 'p'], {'class': lambda x: x and any(term in str(x).lower() for term in ['phone', 'tel', 'mobile', 'contact'])}),
-                (['span', 'div', 'p'], {'text': lambda x: x and any(term in str(x).lower() for term in ['phone:', 'tel:', 'mobile:', 'call:'])})
-            ]
-            
-            found_phones = set()
-            for tag, attrs in phone_patterns:
-                elements = soup.find_all(tag, attrs)
-                for elem in elements:
-                    if 'href' in elem.attrs and 'tel:' in elem['href']:
-                        phone = elem['href'].replace('tel:', '').strip()
-                        found_phones.add(phone)
-                    else:
-                        text = elem.get_text(strip=True)
-                        phone_matches = re.findall(r'[\(]?\d{2,3}[\)]?\s*\d{3,4}[\s-]?\d{4}', text)
-                        found_phones.update(phone_matches)
-            
-            if found_phones:
-                phones = list(found_phones)
-                details['phone'] = phones[0]
-                if len(phones) > 1:
-                    details['additional_phones'] = phones[1:]
-                print(f"Found phone number(s): {phones}")
-
-            # Extract email addresses with proper domain handling
-            email_patterns = [
-                ('a', {'href': lambda x: x and 'mailto:' in x}),
-                (['span', 'div', 'p'], {'class': lambda x: x and any(term in str(x).lower() for term in ['email', 'mail', 'contact'])}),
-                (['span', 'div', 'p'], {'text': lambda x: x and 'email' in str(x).lower()})
-            ]
-            
-            found_emails = set()
-            for tag, attrs in email_patterns:
-                elements = soup.find_all(tag, attrs)
-                for elem in elements:
-                    if 'href' in elem.attrs and 'mailto:' in elem['href']:
-                        email = elem['href'].replace('mailto:', '').strip()
-                        # Extract email up to first .com or .ie
-                        if '.com' in email:
-                            email = email.split('.com')[0] + '.com'
-                        elif '.ie' in email:
-                            email = email.split('.ie')[0] + '.ie'
-                        if email:
-                            found_emails.add(email.lower())
-                    else:
-                        text = elem.get_text(strip=True)
-                        # Extract emails and clean them
-                        email_matches = re.findall(r'[\w\.-]+@[\w\.-]+\.[a-zA-Z]{2,}', text)
-                        for email in email_matches:
-                            if '.com' in email:
-                                email = email.split('.com')[0] + '.com'
-                            elif '.ie' in email:
-                                email = email.split('.ie')[0] + '.ie'
-                            if email:
-                                found_emails.add(email.lower())
-            
-            if found_emails:
-                emails = list(found_emails)
-                details['email'] = emails[0]
-                if len(emails) > 1:
-                    details['additional_emails'] = emails[1:]
-                print(f"Found email(s): {emails}")
-
-            # Extract website
-            website_elements = soup.find_all('a', href=True)
-            for elem in website_elements:
-                href = elem['href'].lower()
-                if (
-                    ('website' in str(elem).lower() or 'globe' in str(elem).lower()) and
-                    href.startswith('http') and
-                    'goldenpages' not in href and
-                    'facebook' not in href and
-                    'twitter' not in href and
-                    'linkedin' not in href
-                ):
-                    details['website'] = href
-                    print(f"Found website: {href}")
-                    break
-
-            # Extract location and categories
-            location_elem = soup.find(['div', 'span', 'p'], {'class': lambda x: x and 'address' in str(x).lower()})
-            if location_elem:
-                details['location'] = location_elem.get_text(strip=True)
-                print(f"Found location: {details['location']}")
-
-            categories_elem = soup.find(['div', 'span'], {'class': lambda x: x and 'categor' in str(x).lower()})
-            if categories_elem:
-                details['categories'] = categories_elem.get_text(strip=True)
-                print(f"Found categories: {details['categories']}")
-
-            # Add county information
-            if county:
-                details['county'] = county
-
-            # Summary
-            print("-"*50)
-            print("Summary:")
-            print(f"Phone: {'Yes' if 'phone' in details else 'No'}")
-            print(f"Email: {'Yes' if 'email' in details else 'No'}")
-            print(f"Website: {'Yes' if 'website' in details else 'No'}")
-            print("="*50 + "\n")
-
-            return details
+            with self.timed('extract'):
+                details = extract_details(response.content)
+            return self.report_details(details, county)
 
         except Exception as e:
             print(f"Error extracting business details: {e}")
             return {}
 
+    def fetch_business_page(self, business_url):
+        """Fetch a business detail page, rendering it only when needed."""
+        print("\n" + "="*50)
+        print(f"Processing business at: {business_url}")
+        return self.fetch_page(business_url, DETAIL_PAGE)
+
+    def iter_business_details(self, items):
+        """
+        Fetch business pages and extract their details in the extract pool, in order.
+
+        Pages are handed to the pool as they arrive, and the oldest result is
+        only waited for once the pool's queue limit of pages is in flight, so
+        the next pages download while earlier ones are extracted on other
+        cores. When the pool is full, handing off a page blocks, which slows
+        fetching to the pace of extraction.
+
+        Args:
+            items (iterable): (business_url, county, item) tuples, consumed lazily;
+                a None URL skips the detail page
+
+        Yields:
+            tuple: (item, details), where details is empty when the page could
+            not be fetched or read
+        """
+        pending = deque()
+
+        def collect():
+            county, item, future = pending.popleft()
+            if future is None:
+                return item, {}
+            try:
+                with self.timed('extract'):
+                    details = future.result()
+                return item, self.report_details(details, county)
+            except Exception as e:
+                print(f"Error extracting business details: {e}")
+                return item, {}
+
+        for business_url, county, item in items:
+            future = None
+            if business_url:
+                try:
+                    response = self.fetch_business_page(business_url)
+                    if response:
+                        # Blocks while the pool is full; extracts here when it has no workers
+                        with self.timed('extract'):
+                            future = self.extract_pool.submit(response.content)
+                except Exception as e:
+                    print(f"Error extracting business details: {e}")
+            pending.append((county, item, future))
+            if len(pending) >= self.extract_pool.queue_limit:
+                yield collect()
+        while pending:
+            yield collect()
+
+    def report_details(self, details, county):
+        """Log what was extracted from a business page and add its county."""
+        if 'name' in details:
+            print(f"Found business name: {details['name']}")
+        if 'phone' in details:
+            print(f"Found phone number(s): {[details['phone']] + details.get('additional_phones', [])}")
+        if 'email' in details:
+            print(f"Found email(s): {[details['email']] + details.get('additional_emails', [])}")
+        if 'website' in details:
+            print(f"Found website: {details['website']}")
+        if 'location' in details:
+            print(f"Found location: {details['location']}")
+        if 'categories' in details:
+            print(f"Found categories: {details['categories']}")
+
+        # Add county information
+        if county:
+            details['county'] = county
+
+        # Summary
+        print("-"*50)
+        print("Summary:")
+        print(f"Phone: {'Yes' if 'phone' in details else 'No'}")
+        print(f"Email: {'Yes' if 'email' in details else 'No'}")
+        print(f"Website: {'Yes' if 'website' in details else 'No'}")
+        print("="*50 + "\n")
+
+        return details
+
     def is_valid_email(self, email):
         """Validate email format and domain."""
         if not email:
@@ -438,60 +578,35 @@ class GoldenPagesScraper:
         if not text:
             return None
             
-        found_emails = set()
+        # One precompiled scan handles plain and [at]/(at)/dot-obfuscated emails
+        found_emails = [email for email in find_emails(text) if self.is_valid_email(email)]
         
-        # Clean text
-        text = text.lower()
-        text = text.replace(' at ', '@').replace('[at]', '@').replace('(at)', '@')
-        text = text.replace(' dot ', '.').replace('[dot]', '.').replace('(dot)', '.')
-        text = text.replace('AT', '@').replace('DOT', '.')
-        text = text.replace(' @ ', '@').replace(' . ', '.')
+        return found_emails if found_emails else None
+
+    def scrape_business_data(self, what, where, fields=None, journal=None):
+        """
+        Scrape business data from Golden Pages with improved pagination and county filtering.
         
-        # Common email domains
-        domains = [
-            'gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com',
-            'live.com', 'icloud.com', 'me.com', 'yahoo.ie', 'hotmail.ie',
-            'eircom.net', 'gmail.ie', 'googlemail.com', 'apple.com'
-        ]
+        Args:
+            what (str): Business type to search for
+            where (str): County to search in
+            fields (str or list, optional): Columns to export, e.g. "name, phone, location".
+                Fields shown on the listing card are taken from it; a business's
+                detail page is only fetched when a requested field is still missing.
+                Defaults to every column.
+            journal (ScrapeJournal, optional): Checkpoint journal. Progress is logged
+                to it, and a journal with earlier progress resumes the scrape:
+                logged records are re-emitted, finished businesses are skipped and
+                the crawl continues after the last finished page.
+        """
+        from bs4 import BeautifulSoup
         
-        # Pattern 1: Look for standard email format with common domains
-        for domain in domains:
-            pattern = rf'[\w\.-]+@{re.escape(domain)}'
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for email in matches:
-                if self.is_valid_email(email):
-                    found_emails.add(email.lower())
-
-        # Pattern 2: Look for any valid email format
-        pattern = r'[\w\.-]+@[\w\.-]+\.\w+'
-        matches = re.findall(pattern, text)
-        for email in matches:
-            if self.is_valid_email(email):
-                found_emails.add(email.lower())
-
-        # Pattern 3: Look for obfuscated emails
-        obfuscated_patterns = [
-            r'[\w\.-]+\s*(?:@|\[at\]|\(at\)|AT)\s*[\w\.-]+\s*(?:\.|\[dot\]|\(dot\)|DOT)\s*\w+',
-            r'[\w\.-]+\s*@\s*[\w\.-]+\s*\.\s*\w+',
-            r'[\w\.-]+\s*\[at\]\s*[\w\.-]+\s*\[dot\]\s*\w+'
-        ]
+        columns = select_columns(fields)
         
-        for pattern in obfuscated_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                cleaned = match.replace('[at]', '@').replace('(at)', '@').replace('AT', '@')
-                cleaned = cleaned.replace('[dot]', '.').replace('(dot)', '.').replace('DOT', '.')
-                cleaned = cleaned.replace(' ', '')
-                if self.is_valid_email(cleaned):
-                    found_emails.add(cleaned.lower())
-
-        return list(found_emails) if found_emails else None
-
-    def scrape_business_data(self, what, where):
-        """Scrape business data from Golden Pages with improved pagination and county filtering."""
-        businesses = []
-        seen_urls = set()  # To avoid duplicate business URLs
+        scratch = ScratchDir(journal.name if journal else None)
+        seen_urls = SeenUrls(directory=scratch.path)  # To avoid duplicate business URLs, spilling to disk on huge searches
         seen_websites = set()  # To track seen website URLs
+        sink = None
         try:
             print(f"Starting search for {what} in {where}")
             
@@ -504,20 +619,25 @@ class GoldenPagesScraper:
             self.successful_scrapes = 0
             self.failed_scrapes = 0
             self.start_time = time.time()
+            self.current_page = 0
+            self.total_count = 0
+            self.stage_times.clear()
             
             # Construct the search URL
             search_url = f"{self.base_url}/q/business/advanced/where/{urllib.parse.quote(where.replace(' ', '+'))}/what/{urllib.parse.quote(what.replace(' ', '+'))}/1"
             print(f"Search URL: {search_url}")
             
             # Get the search results page with retry
-            response = self.make_request_with_retry(search_url)
+            response = self.fetch_page(search_url, SEARCH_PAGE)
             if not response:
                 raise ConnectionError(f"Failed to access search page for URL: {search_url}")
 
             # Parse the initial page to get total results
-            soup = BeautifulSoup(response.content, 'lxml')
+            with self.timed('parse'):
+                soup = BeautifulSoup(response.content, 'lxml')
             
             # Find the total results count
+            planned_pages = None  # Result page URLs after the first, when the count allows planning them
             results_info = soup.find('div', {'class': 'results_info'})
             if results_info:
                 results_text = results_info.get_text(strip=True)
@@ -525,6 +645,9 @@ class GoldenPagesScraper:
                 if total_results:
                     total_count = int(total_results.group(1))
                     print(f"Found {total_count} total results")
+                    planned_pages = self.plan_result_pages(
+                        search_url, results_text, len(soup.find_all('div', {'class': 'listing_container'}))
+                    )
                 else:
                     total_count = 0
             else:
@@ -535,60 +658,75 @@ class GoldenPagesScraper:
             if total_count == 0:
                 return None, f"No businesses found for {what} in {where}"
 
+            self.total_count = total_count
+
+            # Stream validated records to disk as they are produced, so memory
+            # stays flat and a crash keeps everything flushed so far
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            slug = f"{what.lower().replace(' ', '_')}_{where.lower().replace(' ', '_')}"
+            # A journaled scrape keeps one partial file across restarts
+            sink = CsvRecordSink(self.downloads_dir, f"business_data_{slug}_{journal.name if journal else timestamp}",
+                                 columns=columns)
+
             page_num = 1
-            while True:
-                print(f"Scraping page {page_num}")
-                
-                listings = soup.find_all('div', {'class': 'listing_container'})
+            if journal and journal.resumed:
+                # Rebuild the state of the interrupted run instead of refetching it
+                for record in journal.iter_records():
+                    record = BusinessRecord(**record)
+                    sink.write(record)
+                    if record.website:
+                        seen_websites.add(record.website.lower())
+                seen_urls.update(journal.iter_done_urls())
+                self.total_processed = journal.done_count
+                self.successful_scrapes = journal.record_count
+                self.failed_scrapes = self.total_processed - self.successful_scrapes
                 
-                if not listings:
-                    print("No listings found on this page")
-                    break
+                if journal.pages_done:
+                    page_num = journal.pages_done + 1
+                    response = self.fetch_page(journal.next_url, SEARCH_PAGE) if journal.next_url else None
+                    with self.timed('parse'):
+                        soup = BeautifulSoup(response.content, 'lxml') if response else None
+            
+            candidates = self.read_results_page(soup, where, seen_urls, columns) if soup else None
+            while candidates is not None:
+                print(f"Scraping page {page_num}")
+                self.current_page = page_num
+                self.report_progress()
+
+                # Planned pages are known up front and downloaded ahead; without
+                # a count, fall back to following the next-page button
+                if planned_pages is not None:
+                    next_url = planned_pages[page_num - 1] if page_num <= len(planned_pages) else None
+                    self.prefetch(planned_pages[page_num - 1:page_num - 1 + SEARCH_PAGE_LOOKAHEAD])
+                else:
+                    next_url = self.find_next_page_url(soup)
+
+                # Read the next page before working through this one, so its
+                # detail pages queue up right behind this page's and the
+                # per-host rate is never left idle between pages
+                next_soup, next_candidates = None, None
+                if next_url:
+                    print(f"Moving to next page: {next_url}")
+                    response = self.fetch_page(next_url, SEARCH_PAGE)
+                    if response:
+                        with self.timed('parse'):
+                            next_soup = BeautifulSoup(response.content, 'lxml')
+                        next_candidates = self.read_results_page(next_soup, where, seen_urls, columns)
+                    else:
+                        print("Failed to get next page")
 
-                for listing in listings:
+                self.prefetch([url for _, url, enrich in candidates + (next_candidates or []) if enrich])
+
+                # Detail pages are only fetched if the card left requested fields empty
+                details_stream = self.iter_business_details(
+                    (business_url if enrich else None, business_data['county'], (business_data, business_url, enrich))
+                    for business_data, business_url, enrich in candidates
+                )
+                for (business_data, business_url, enrich), additional_details in details_stream:
+                    name = business_data['name']
+                    county = business_data['county']
                     try:
-                        business_data = {}
-                        
-                        # Get business name and URL
-                        title_elem = listing.find('h3', {'class': 'listing_title'})
-                        if not title_elem:
-                            continue
-
-                        name = title_elem.get_text(strip=True)
-                        # Remove leading numbers and "Sponsored" text
-                        name = ' '.join(word for word in name.split() if not word.isdigit() and word != "Sponsored")
-                        business_data['name'] = name
-                        
-                        # Get business URL
-                        business_url = None
-                        title_link = title_elem.find('a')
-                        if title_link:
-                            business_url = self.base_url + title_link['href'] if title_link['href'].startswith('/') else title_link['href']
-                            
-                            # Skip if we've already seen this exact business URL
-                            if business_url in seen_urls:
-                                continue
-                            seen_urls.add(business_url)
-
-                        # Get location and extract county
-                        location = listing.find('div', {'class': 'listing_address'})
-                        location_text = location.get_text(strip=True) if location else ''
-                        business_data['location'] = location_text
-                        county = self.extract_county(location_text)
-                        
-                        # Only process businesses in the specified county
-                        if county and county.lower() != where.lower():
-                            continue
-
-                        business_data['county'] = county
-
-                        # Get categories
-                        categories = listing.find('div', {'class': 'listing_categories'})
-                        business_data['categories'] = categories.get_text(strip=True) if categories else ''
-
-                        # Get additional details if business URL exists
-                        if business_url:
-                            additional_details = self.extract_business_details(business_url, county)
+                        if enrich:
                             if additional_details:
                                 # First, try to extract website from info@ email
                                 if 'email' in additional_details:
@@ -620,14 +758,20 @@ class GoldenPagesScraper:
 
                         # Validate and add the business data
                         if self.validate_business_data(business_data):
-                            businesses.append(business_data)
+                            record = normalize_record(BusinessRecord.from_dict(business_data))
+                            with self.timed('write'):
+                                sink.write(record)
+                            if journal and business_url:
+                                journal.business_done(business_url, record._asdict())
                             self.update_progress(success=True)
-                            print(f"Added business: {name} ({county}) - Progress: {len(businesses)}/{total_count}")
+                            print(f"Added business: {name} ({county}) - Progress: {sink.count}/{total_count}")
                             if business_data.get('website'):
                                 print(f"Found website: {business_data['website']}")
                             if business_data.get('email'):
                                 print(f"Found email: {business_data['email']}")
                         else:
+                            if journal and business_url:
+                                journal.business_done(business_url)
                             self.update_progress(success=False)
                             print(f"Skipped invalid business data: {name}")
 
@@ -636,64 +780,177 @@ class GoldenPagesScraper:
                         self.update_progress(success=False)
                         continue
 
-                # Look for next page
-                next_button = soup.find('button', {
-                    'class': 'btn_normal btn_pagination clickable',
-                    'id': 'btn_pagination_next'
-                })
-                
-                if not next_button:
-                    print("No next page button found")
-                    break
-
-                next_url = next_button.get('data-url')
-                if not next_url:
-                    print("No next page URL found")
-                    break
-
-                if not next_url.startswith('http'):
-                    next_url = self.base_url + next_url
-
-                print(f"Moving to next page: {next_url}")
-                
-                response = self.make_request_with_retry(next_url)
-                if not response:
-                    print("Failed to get next page")
-                    break
-
-                soup = BeautifulSoup(response.content, 'lxml')
+                if journal:
+                    journal.page_done(page_num, next_url)
+                soup, candidates = next_soup, next_candidates
                 page_num += 1
 
-            if not businesses:
+            if not sink.count:
+                sink.discard()
                 return None, "No businesses found"
 
-            # Save to CSV with timestamp and total count
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"business_data_{what.lower().replace(' ', '_')}_{where.lower().replace(' ', '_')}_{len(businesses)}results_{timestamp}.csv"
-            
-            # Define column order
-            columns = ['name', 'phone', 'email', 'website', 'location', 'county', 'categories']
-            
-            # Create DataFrame with specified column order
-            df = pd.DataFrame(businesses)
+            # Name the file with the total count now that it is known
+            filename = f"business_data_{slug}_{sink.count}results_{timestamp}.csv"
+            with self.timed('write'):
+                sink.finish(filename)
             
-            # Reorder columns, only including those that exist
-            existing_columns = [col for col in columns if col in df.columns]
-            df = df[existing_columns]
-            
-            # Save to CSV in Downloads folder
-            full_path = os.path.join(self.downloads_dir, filename)
-            df.to_csv(full_path, index=False, encoding='utf-8-sig')
-            
-            return os.path.basename(filename), (
-                f"Successfully scraped {len(businesses)} businesses in {where}. "
+            return filename, (
+                f"Successfully scraped {sink.count} businesses in {where}. "
                 f"Success rate: {(self.successful_scrapes / self.total_processed * 100):.1f}% "
                 f"({self.successful_scrapes}/{self.total_processed})"
             )
 
         except Exception as e:
+            if sink:
+                sink.close()  # Rows flushed so far stay in the .partial.csv file
+                print(f"Partial results kept in {sink.path}")
             print(f"Error during scraping: {e}")
             return None, f"Error scraping data: {str(e)}"
+        
+        finally:
+            self.cancel_prefetches()
+            seen_urls.close()
+            scratch.remove()
+
+    def read_results_page(self, soup, where, seen_urls, columns):
+        """
+        Turn the listing cards of a results page into work items.
+        
+        Cards for businesses already seen or outside ``where`` are dropped.
+        
+        Returns:
+            list: (business_data, business_url, enrich) tuples, where ``enrich``
+            means the detail page is needed for a requested column; None if the
+            page has no listings
+        """
+        listings = soup.find_all('div', {'class': 'listing_container'})
+        if not listings:
+            print("No listings found on this page")
+            return None
+
+        candidates = []
+        for listing in listings:
+            try:
+                card = self.parse_listing_card(listing)
+                if not card:
+                    continue
+                business_data, business_url = card
+                
+                # Skip if we've already seen this exact business URL
+                if business_url and not seen_urls.add(business_url):
+                    continue
+                
+                # Only process businesses in the specified county
+                county = business_data['county']
+                if county and county.lower() != where.lower():
+                    continue
+                
+                # Only businesses whose card lacks a requested field need their detail page
+                enrich = bool(business_url) and any(not business_data.get(column) for column in columns)
+                candidates.append((business_data, business_url, enrich))
+                
+            except Exception as e:
+                print(f"Error processing listing: {e}")
+                self.update_progress(success=False)
+                continue
+        return candidates
+
+    def plan_result_pages(self, first_url, results_text, listings_on_page):
+        """
+        Work out the URLs of every results page after the first.
+        
+        Args:
+            first_url (str): URL of page 1, ending in the page number
+            results_text (str): The results counter, e.g. "1 - 20 of 134 results"
+            listings_on_page (int): Listings on page 1, used when the counter has no range
+            
+        Returns:
+            list: URLs of pages 2..N, or None if they cannot be derived
+        """
+        page_number = re.search(r'/1/?$', first_url)
+        counter = re.search(r'(?:(\d+)\s*-\s*(\d+)\s+)?of\s+(\d+)\s+results?', results_text)
+        if not page_number or not counter:
+            return None
+
+        if counter.group(1):
+            per_page = int(counter.group(2)) - int(counter.group(1)) + 1
+        else:
+            per_page = listings_on_page
+        total = int(counter.group(3))
+        if per_page <= 0:
+            return None
+
+        pages = -(-total // per_page)  # Ceiling division
+        prefix = first_url[:page_number.start()]
+        print(f"Planned {pages} result pages of {per_page} listings")
+        return [f"{prefix}/{page}" for page in range(2, pages + 1)]
+
+    def parse_listing_card(self, listing):
+        """
+        Read the fields shown on a search-results listing card.
+        
+        Returns:
+            tuple: (business_data, business_url), or None if the card has no title
+        """
+        business_data = {}
+        
+        # Get business name and URL
+        title_elem = listing.find('h3', {'class': 'listing_title'})
+        if not title_elem:
+            return None
+
+        name = title_elem.get_text(strip=True)
+        # Remove leading numbers and "Sponsored" text
+        name = ' '.join(word for word in name.split() if not word.isdigit() and word != "Sponsored")
+        business_data['name'] = name
+        
+        # Get business URL
+        business_url = None
+        title_link = title_elem.find('a')
+        if title_link:
+            business_url = self.base_url + title_link['href'] if title_link['href'].startswith('/') else title_link['href']
+
+        # Get location and extract county
+        location = listing.find('div', {'class': 'listing_address'})
+        location_text = location.get_text(strip=True) if location else ''
+        business_data['location'] = location_text
+        business_data['county'] = self.extract_county(location_text)
+
+        # Get categories
+        categories = listing.find('div', {'class': 'listing_categories'})
+        business_data['categories'] = categories.get_text(strip=True) if categories else ''
+        
+        # Some cards carry call and email buttons, which saves a detail page visit
+        phone_link = listing.find('a', href=re.compile(r'^tel:'))
+        if phone_link:
+            business_data['phone'] = phone_link['href'][4:].strip()
+        email_link = listing.find('a', href=re.compile(r'^mailto:'))
+        if email_link:
+            email = email_link['href'][7:].split('?')[0].strip()
+            if self.is_valid_email(email):
+                business_data['email'] = email
+        
+        return business_data, business_url
+
+    def find_next_page_url(self, soup):
+        """Return the absolute URL of the next results page, or None on the last page."""
+        next_button = soup.find('button', {
+            'class': 'btn_normal btn_pagination clickable',
+            'id': 'btn_pagination_next'
+        })
+        
+        if not next_button:
+            print("No next page button found")
+            return None
+
+        next_url = next_button.get('data-url')
+        if not next_url:
+            print("No next page URL found")
+            return None
+
+        if not next_url.startswith('http'):
+            next_url = self.base_url + next_url
+        return next_url
 
     def extract_county(self, location_text):
         """Extract county from location text."""
@@ -719,231 +976,497 @@ class GoldenPagesScraper:
                 
         return None
 
-    def scrape_entire_sitemap(self, output_file='full_golden_pages_businesses.csv', max_businesses=10):
+    def scrape_entire_sitemap(self, output_file=None, max_businesses=SITEMAP_MAX_BUSINESSES, journal=None,
+                              sitemap_url=None):
         """
-        Simplified sitemap scraping for debugging.
+        Crawl the business sitemap and export every business it lists.
+        
+        Sitemap indexes are followed, and XML and HTML sitemaps are parsed as
+        a stream, so memory does not grow with their size. Business URLs go
+        through a deduplicating frontier, are downloaded a window ahead under
+        the per-host rate and are streamed to CSV as they are scraped.
         
         Args:
-            output_file (str): Filename to save the complete business data
-            max_businesses (int, optional): Limit the number of businesses to scrape
+            output_file (str, optional): Export filename in the downloads directory;
+                defaults to a timestamped name
+            max_businesses (int, optional): Stop after this many business pages; 0 means no limit
+            journal (ScrapeJournal, optional): Checkpoint journal. Sitemaps and businesses
+                it lists as finished are skipped and their records re-emitted
+            sitemap_url (str, optional): Sitemap or sitemap index to start from;
+                defaults to the site's business sitemap
         
         Returns:
-            tuple: (filename, total_businesses_scraped, errors)
+            tuple: (filename, stats, errors)
         """
         print("Starting sitemap scraping...")
-        sitemap_url = f"{self.base_url}/business/sitemap"
         
-        # Ensure downloads directory exists
-        os.makedirs('downloads', exist_ok=True)
-        logging_file = os.path.join('downloads', 'sitemap_debug_log.txt')
+        # Reset progress tracking; pages are sitemaps here
+        self.total_processed = 0
+        self.successful_scrapes = 0
+        self.failed_scrapes = 0
+        self.start_time = time.time()
+        self.current_page = 0
+        self.total_count = max_businesses or 0
+        self.stage_times.clear()
         
-        # Track scraping progress
-        total_businesses = 0
-        successful_businesses = 0
         errors = []
-        all_businesses = []
+        scratch = ScratchDir(journal.name if journal else None)
+        sitemaps = UrlFrontier(journal.done_sitemaps if journal else (), directory=scratch.path)
+        sitemaps.add(sitemap_url or f"{self.base_url}/business/sitemap")
+        businesses = UrlFrontier(journal.iter_done_urls() if journal else (), directory=scratch.path)
+        window = max(self.fetch_engine.prefetch_limit // 2, 1)  # Business pages downloaded ahead
+        
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        sink = CsvRecordSink(self.downloads_dir, f"sitemap_businesses_{journal.name if journal else timestamp}",
+                             columns=SITEMAP_COLUMNS)
+        
+        def room_left():
+            # Queued URLs count too, so nothing is prefetched past the limit
+            return not max_businesses or self.total_processed + len(businesses) < max_businesses
         
         try:
-            # Open logging file
-            with open(logging_file, 'w', encoding='utf-8') as log_file:
-                def log(message):
-                    print(message)
-                    log_file.write(message + '\n')
-                    log_file.flush()
-                
-                log(f"Fetching sitemap from: {sitemap_url}")
-                
-                # Fetch sitemap page
-                response = self.make_request_with_retry(sitemap_url)
+            if journal:
+                for record in journal.iter_records():
+                    sink.write(BusinessRecord(**record))
+                self.total_processed = self.successful_scrapes = journal.record_count
+            
+            while len(sitemaps) and room_left():
+                url, _ = sitemaps.pop()
+                self.current_page += 1
+                print(f"Fetching sitemap: {url}")
+                response = self.make_request_with_retry(url)
                 if not response:
-                    log("Failed to fetch sitemap!")
-                    return None, None, "Could not access sitemap"
-                
-                # Parse sitemap
-                soup = BeautifulSoup(response.content, 'lxml')
-                
-                # Find business links
-                business_links = soup.find_all('a', href=lambda href: href and '/business/' in href)
-                log(f"Found {len(business_links)} potential business pages")
-                
-                # Limit businesses for testing
-                business_links = business_links[:max_businesses]
+                    print(f"Failed to fetch sitemap: {url}")
+                    errors.append({'url': url, 'error': 'Could not fetch sitemap'})
+                    continue
                 
-                for link in business_links:
-                    try:
-                        business_url = link['href']
-                        if not business_url.startswith('http'):
-                            business_url = f"{self.base_url}{business_url}"
-                        
-                        log(f"Processing business URL: {business_url}")
-                        
-                        # Extract business details
-                        business_details = self.extract_business_details(business_url, None)
-                        
-                        if business_details:
-                            business_details['source_url'] = business_url
-                            all_businesses.append(business_details)
-                            successful_businesses += 1
-                            log(f"Successfully scraped: {business_details.get('name', 'Unknown Business')}")
-                        
-                        total_businesses += 1
-                        
-                        # Small delay to be respectful
-                        time.sleep(0.5)
-                    
-                    except Exception as e:
-                        log(f"Error processing business: {e}")
-                        errors.append({'url': business_url, 'error': str(e)})
-                
-                # Save to CSV
-                if all_businesses:
-                    df = pd.DataFrame(all_businesses)
-                    full_path = os.path.join('downloads', output_file)
-                    df.to_csv(full_path, index=False, encoding='utf-8-sig')
-                    log(f"Saved {len(all_businesses)} businesses to {full_path}")
+                found = children = 0
+                for kind, link in iter_sitemap(response.content, url):
+                    if kind == SITEMAP:
+                        children += 1
+                        sitemaps.add(link)
+                        continue
+                    if not room_left():
+                        break
+                    if businesses.add(link):
+                        found += 1
+                        self.prefetch([link])
+                        if len(businesses) >= window:
+                            self.scrape_sitemap_businesses(businesses, sink, journal, errors, keep=window // 2)
+                print(f"Sitemap {url}: {found} new businesses")
                 
-                return (
-                    output_file, 
-                    {
-                        'total_processed': total_businesses,
-                        'successful': successful_businesses,
-                        'errors': len(errors)
-                    },
-                    errors
-                )
+                # A sitemap only counts as done once every business it listed is.
+                # Indexes are never journaled: a resumed crawl re-reads them to
+                # rediscover the child sitemaps that are still to do.
+                while len(businesses):
+                    self.scrape_sitemap_businesses(businesses, sink, journal, errors)
+                if journal and not children and room_left():
+                    journal.sitemap_done(url)
+            
+            stats = {
+                'sitemaps': self.current_page,
+                'total_processed': self.total_processed,
+                'successful': self.successful_scrapes,
+                'errors': len(errors)
+            }
+            if not sink.count:
+                sink.discard()
+                return None, stats, errors or "No businesses found"
+            
+            filename = output_file or f"sitemap_businesses_{sink.count}results_{timestamp}.csv"
+            with self.timed('write'):
+                sink.finish(filename)
+            print(f"Saved {sink.count} businesses to {sink.path}")
+            return filename, stats, errors
         
         except Exception as e:
+            sink.close()  # Rows flushed so far stay in the .partial.csv file
             print(f"Sitemap scraping failed: {e}")
             return None, None, str(e)
+        
+        finally:
+            self.cancel_prefetches()
+            sitemaps.close()
+            businesses.close()
+            scratch.remove()
 
-# Initialize the scraper
-scraper = None
+    def scrape_sitemap_businesses(self, businesses, sink, journal, errors, keep=0):
+        """
+        Scrape businesses from the frontier until ``keep`` are left and stream their records to ``sink``.
+        
+        Detail pages go through the extract pool, so they are fetched while
+        earlier ones are extracted. A business whose page yields nothing is
+        put back at a lower priority and retried once, after the businesses
+        already queued.
+        """
+        def queued():
+            while len(businesses) > keep:
+                business_url, attempt = businesses.pop()
+                yield business_url, None, (business_url, attempt)
+        
+        for (business_url, attempt), details in self.iter_business_details(queued()):
+            try:
+                if details.get('location') and not details.get('county'):
+                    details['county'] = self.extract_county(details['location'])
+                details['source_url'] = business_url
+                
+                if not details.get('name'):
+                    if attempt == 0:
+                        businesses.requeue(business_url, 1)
+                        continue
+                    # Not journaled, so a resumed crawl tries it again
+                    errors.append({'url': business_url, 'error': 'No business details found'})
+                    self.update_progress(success=False)
+                    continue
+                
+                record = normalize_record(BusinessRecord.from_dict(details))
+                with self.timed('write'):
+                    sink.write(record)
+                if journal:
+                    journal.business_done(business_url, record._asdict())
+                self.update_progress(success=True)
+                print(f"Successfully scraped: {record.name}")
+            
+            except Exception as e:
+                print(f"Error processing business: {e}")
+                errors.append({'url': business_url, 'error': str(e)})
+                self.update_progress(success=False)
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+def run_search_job(job_id, what, where, fields=None, refresh=False):
+    """
+    Run a Golden Pages search in a background worker, resuming from its journal if it has one.
+    
+    A ``refresh`` run revalidates every page with the site instead of
+    trusting fresh HTTP cache entries.
+    """
+    scraper = GoldenPagesScraper()
+    scraper.revalidate_cache = refresh
+    scraper.progress_callback = lambda progress: job_store.update_progress(job_id, progress)
+    journal = ScrapeJournal.for_job(job_id)
+    try:
+        filename, message = scraper.scrape_business_data(what, where, fields, journal=journal)
+    finally:
+        journal.close()
+    
+    if not filename:
+        if not journal.resumed:
+            journal.discard()  # Nothing was checkpointed, so a resume would start over anyway
+        raise RuntimeError(message)
+    journal.discard()
+    
+    # Emails are already normalised by the scraper, so the file is final
+    return {
+        'filename': filename,
+        'message': message
+    }
+
+def run_sitemap_job(job_id, max_businesses=SITEMAP_MAX_BUSINESSES):
+    """Crawl the business sitemap in a background worker, resuming from its journal if it has one."""
+    scraper = GoldenPagesScraper()
+    scraper.progress_callback = lambda progress: job_store.update_progress(job_id, progress)
+    journal = ScrapeJournal.for_job(job_id)
+    try:
+        filename, stats, errors = scraper.scrape_entire_sitemap(max_businesses=max_businesses, journal=journal)
+    finally:
+        journal.close()
+    
+    if not filename:
+        if not journal.resumed:
+            journal.discard()  # Nothing was checkpointed, so a resume would start over anyway
+        raise RuntimeError(errors if isinstance(errors, str) else 'Sitemap scraping failed')
+    journal.discard()
+    return {
+        'filename': filename,
+        'message': f"Scraped {stats['successful']} businesses from {stats['sitemaps']} sitemaps",
+        'stats': stats,
+        'errors': errors[:100]  # Enough to spot a pattern without bloating the job row
+    }
+
+# Background jobs are shared across gunicorn workers through the job store
+job_store = JobStore()
+job_queue = JobQueue(job_store)
+job_queue.register('search', run_search_job)
+job_queue.register('sitemap', run_sitemap_job)
+
+# Crawls killed mid-run leave their frontier databases behind. A job whose
+# worker died still says "running"; its scratch goes once it has gone stale.
+sweep_scratch_dirs(job_store.is_live)
+# Journals of jobs that failed and were never resumed would otherwise pile up
+sweep_journals(lambda job_id: job_store.is_resumable(job_id, JOURNAL_RETENTION))
+
+def search_query_key(what, where, fields=None):
+    """Normalised cache key for a search, so "Plumber " and "plumber" share results."""
+    key = f"{' '.join(what.lower().split())}|{' '.join(where.lower().split())}"
+    columns = select_columns(fields)
+    if len(columns) < len(COLUMNS):
+        key += f"|{','.join(columns)}"  # Projections are exported separately
+    return key
+
+def cached_search(query_key):
+    """Return a recent completed search job whose export still exists, or None."""
+    if SEARCH_CACHE_TTL <= 0:
+        return None
+    job = job_store.find_result('search', query_key, SEARCH_CACHE_TTL)
+    if job and job['result'] and find_export(job['result'].get('filename')):
+        return job
+    return None
+
+def submit_search(what, where, refresh=False, fields=None):
+    """
+    Queue a search job and build the JSON response for it.
+    
+    A search that already finished within SEARCH_CACHE_TTL is answered
+    straight away with its existing export, unless ``refresh`` is set, in
+    which case the new crawl also revalidates pages held in the HTTP cache.
+    ``fields`` limits the export to some columns (see scrape_business_data).
+    """
+    try:
+        query_key = search_query_key(what, where, fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if not refresh:
+        job = cached_search(query_key)
+        if job:
+            payload = job_payload(job)
+            payload.update({
+                'success': True,
+                'cached': True,
+                'status_url': f"/jobs/{job['id']}"
+            })
+            return jsonify(payload), 200
+    
+    try:
+        # Identical searches already in flight are joined rather than re-crawled
+        params = {'what': what, 'where': where}
+        if fields:
+            params['fields'] = select_columns(fields)
+        if refresh:
+            params['refresh'] = True
+        job_id = job_queue.submit('search', params, query_key)
+    except QueueFullError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 503
+        
+    # The job may be one that was already running for another caller
+    payload = job_payload(job_store.get(job_id))
+    payload.update({
+        'success': True,
+        'status_url': f"/jobs/{job_id}"
+    })
+    return jsonify(payload), 202
+
 @app.route('/search_businesses', methods=['POST'])
 def search_businesses():
     data = request.get_json()
     if not data or 'what' not in data or 'where' not in data:
         return jsonify({'error': 'Please provide both business type and location'}), 400
         
-    what = data['what']
-    where = data['where']
-    
-    scraper = GoldenPagesScraper()
-    filename, message = scraper.scrape_business_data(what, where)
+    return submit_search(data['what'], data['where'], refresh=bool(data.get('refresh')),
+                         fields=data.get('fields'))
+
+def job_payload(job):
+    """Build the public JSON view of a job."""
+    payload = {
+        'job_id': job['id'],
+        'kind': job['kind'],
+        'status': job['status'],
+        'params': job['params'],
+        'progress': job['progress'],
+        'created_at': job['created_at'],
+        'started_at': job['started_at'],
+        'finished_at': job['finished_at']
+    }
     
-    if filename:
-        # Clean any email addresses during scraping
-        downloads_dir = str(Path.home() / "Downloads")
-        file_path = os.path.join(downloads_dir, filename)
-        
-        if os.path.exists(file_path):
-            # Read the CSV
-            df = pd.read_csv(file_path)
+    if job['result']:
+        payload.update(job['result'])
+        if job['result'].get('filename'):
+            payload['download_url'] = f"/download/{job['result']['filename']}"
             
-            # Clean emails if they exist
-            if 'email' in df.columns:
-                df['email'] = df['email'].apply(lambda x: clean_email(x) if pd.notnull(x) else x)
-            
-            # Save back to CSV
-            df.to_csv(file_path, index=False)
+    if job['error']:
+        payload['message'] = job['error']
         
-        return jsonify({
-            'success': True,
-            'message': message,
-            'filename': filename
-        })
-    else:
+    return payload
+
+@app.route('/metrics/rate')
+def rate_metrics():
+    """Report the adaptive request rate this worker uses for each host."""
+    from fetch_engine import get_fetch_engine
+    return jsonify(get_fetch_engine().rate_state())
+
+@app.route('/metrics/drivers')
+def driver_metrics():
+    """Report this worker's Chrome driver pool usage."""
+    return jsonify(get_driver_pool().stats())
+
+@app.route('/metrics/extract')
+def extract_metrics():
+    """Report this worker's extract pool usage and how long fetching waited on it."""
+    return jsonify(get_extract_pool().stats())
+
+@app.route('/metrics/render')
+def render_metrics():
+    """Report which URL patterns are fetched over HTTP and which need Chrome."""
+    return jsonify(RenderPolicy().stats() if RENDER_FALLBACK else {})
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Report the status and result metadata of a background job."""
+    job = job_store.get(job_id)
+    if not job:
+        return jsonify({'error': f'Job not found: {job_id}'}), 404
+        
+    return jsonify(job_payload(job))
+
+@app.route('/jobs/<job_id>/resume', methods=['POST'])
+def resume_job(job_id):
+    """Restart a failed or interrupted job from its checkpoint journal."""
+    job = job_store.get(job_id)
+    if not job:
+        return jsonify({'error': f'Job not found: {job_id}'}), 404
+    
+    try:
+        resumed = job_queue.resume(job_id)
+    except QueueFullError as e:
+        return jsonify({'success': False, 'message': str(e)}), 503
+    
+    if not resumed:
         return jsonify({
             'success': False,
-            'message': message
-        }), 400
-
-def clean_email(email: str) -> str:
-    """Clean email by removing numbers before 'info' and fixing domain duplications."""
-    try:
-        if not email or '@' not in email:
-            return email
-            
-        local, domain = email.split('@', 1)
-        
-        # Remove numbers before 'info'
-        if 'info' in local:
-            local = re.sub(r'^\d+info', 'info', local)
-        
-        # Handle common domain duplications
-        if '.ie' in domain:
-            base_domain = domain.split('.ie')[0]
-            domain = f"{base_domain}.ie"
-        elif '.com' in domain:
-            base_domain = domain.split('.com')[0]
-            domain = f"{base_domain}.com"
-            
-        return f"{local}@{domain}"
+            'message': f"Job {job_id} is {job['status']} and cannot be resumed"
+        }), 409
+    
+    payload = job_payload(job_store.get(job_id))
+    payload.update({
+        'success': True,
+        'status_url': f"/jobs/{job_id}"
+    })
+    return jsonify(payload), 202
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """
+    Stream job progress as Server-Sent Events until the job finishes.
+    
+    Each stream ends after JOB_EVENTS_STREAM_SECONDS, well inside the
+    sync gunicorn worker's timeout, so an open page never holds a worker
+    (and the job threads running in it) long enough to be killed.
+    EventSource reconnects on its own after the ``retry`` delay and gets
+    the current progress again.
+    """
+    if not job_store.get(job_id):
+        return jsonify({'error': f'Job not found: {job_id}'}), 404
         
-    except Exception as e:
-        print(f"Error cleaning email: {e}")
-        return email
+    def generate():
+        last_progress = None
+        last_sent = started = time.time()
+        yield "retry: 1000\n\n"
+        
+        while time.time() - started < JOB_EVENTS_STREAM_SECONDS:
+            job = job_store.get(job_id)
+            if not job:
+                break
+                
+            if job['progress'] and job['progress'] != last_progress:
+                last_progress = job['progress']
+                last_sent = time.time()
+                yield f"event: progress\ndata: {json.dumps(job['progress'])}\n\n"
+                
+            if job['status'] in ('completed', 'failed'):
+                yield f"event: done\ndata: {json.dumps(job_payload(job))}\n\n"
+                break
+                
+            # Keep the connection open through proxies while nothing changes
+            if time.time() - last_sent > 15:
+                last_sent = time.time()
+                yield ": keep-alive\n\n"
+                
+            time.sleep(1)
+            
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
 
 @app.route('/download/<filename>')
 def download(filename):
-    """Download the CSV file."""
+    """
+    Download an export as CSV (default) or NDJSON (?format=ndjson).
+    
+    Responses are streamed and compressed on the fly with zstd or gzip when
+    the client accepts it. Uncompressed CSV downloads support Range and
+    If-Range, so interrupted downloads of large exports can resume.
+    """
     try:
-        downloads_dir = str(Path.home() / "Downloads")
-        file_path = os.path.join(downloads_dir, filename)
+        file_path = find_export(filename)
+        if not file_path:
+            return jsonify({'error': f'File not found: {filename}'}), 404
         
-        if not os.path.exists(file_path):
-            return jsonify({'error': f'File not found in Downloads folder: {filename}'}), 404
-            
-        return send_file(
-            file_path,
-            mimetype='text/csv',
-            as_attachment=True,
-            download_name=filename
-        )
+        export_format = request.args.get('format', 'csv').lower()
+        if export_format not in FORMATS:
+            return jsonify({'error': f"Unsupported format: {export_format}"}), 400
+        
+        download_name = filename if export_format == 'csv' else f"{os.path.splitext(filename)[0]}.{export_format}"
+        encoding = choose_encoding(request.accept_encodings)
+        
+        # Resumable downloads: byte ranges only make sense on the stored file
+        if export_format == 'csv' and (encoding is None or request.range):
+            response = send_file(
+                file_path,
+                mimetype=FORMATS['csv'],
+                as_attachment=True,
+                download_name=download_name,
+                conditional=True
+            )
+            response.headers['Vary'] = 'Accept-Encoding'
+            return response
+        
+        chunks = iter_file(file_path) if export_format == 'csv' else iter_ndjson(file_path)
+        headers = {
+            'Content-Disposition': f'attachment; filename="{download_name}"',
+            'Vary': 'Accept-Encoding',
+            'X-Accel-Buffering': 'no'
+        }
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        return Response(compress(chunks, encoding), mimetype=FORMATS[export_format], headers=headers)
     except Exception as e:
         return jsonify({'error': str(e)}), 404
 
 @app.route('/scrape_sitemap', methods=['POST'])
 def scrape_sitemap():
-    print("Sitemap scraping route triggered!")
+    """Start a background crawl of the business sitemap. Accepts an optional JSON ``max_businesses``."""
+    data = request.get_json(silent=True) or {}
     try:
-        global scraper
-        if scraper is None:
-            print("Initializing new scraper...")
-            scraper = GoldenPagesScraper()
-        
-        print("Calling scrape_entire_sitemap method...")
-        filename, stats, errors = scraper.scrape_entire_sitemap()
-        
-        print(f"Scraping result - Filename: {filename}")
-        print(f"Scraping result - Stats: {stats}")
-        print(f"Scraping result - Errors: {errors}")
-        
-        if filename:
-            return jsonify({
-                'success': True,
-                'filename': filename,
-                'stats': stats,
-                'errors': errors
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'message': 'Sitemap scraping failed'
-            }), 500
+        max_businesses = int(data.get('max_businesses') or SITEMAP_MAX_BUSINESSES)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'max_businesses must be a number'}), 400
     
-    except Exception as e:
-        print(f"Sitemap scraping route error: {e}")
-        import traceback
-        traceback.print_exc()
+    try:
+        # One crawl per limit at a time; repeated requests join it
+        job_id = job_queue.submit('sitemap', {'max_businesses': max_businesses}, f"sitemap|{max_businesses}")
+    except QueueFullError as e:
         return jsonify({
             'success': False,
             'message': str(e)
-        }), 500
+        }), 503
+    
+    payload = job_payload(job_store.get(job_id))
+    payload.update({
+        'success': True,
+        'status_url': f"/jobs/{job_id}"
+    })
+    return jsonify(payload), 202
 
 @app.route('/scrape')
 def scrape():
@@ -953,44 +1476,22 @@ def scrape():
     if not what or not where:
         return jsonify({'error': 'Please provide both business type and location'}), 400
     
-    global scraper
-    if scraper is None:
-        scraper = GoldenPagesScraper()
-    
-    filename, message = scraper.scrape_business_data(what, where)
-    
-    if filename:
-        return jsonify({
-            'success': True,
-            'message': message,
-            'filename': filename
-        })
-    else:
-        return jsonify({
-            'success': False,
-            'message': message
-        }), 400
-
-def setup_driver():
-    chrome_options = Options()
-    chrome_options.add_argument('--headless')
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    chrome_options.add_argument('--window-size=1920,1080')  # Set a good size for screenshots
-    return webdriver.Chrome(options=chrome_options)
+    refresh = request.args.get('refresh', '').lower() in ('1', 'true', 'yes')
+    return submit_search(what, where, refresh=refresh, fields=request.args.get('fields'))
 
 def scrape_business(driver, url, analyzer):
     try:
         driver.get(url)
-        time.sleep(2)  # Wait for page to load
+        heading = wait_for_element(driver, 'h1')
+        wait_for_page_load(driver)  # Images must be in before the screenshot
         
         # Take screenshot of the business page
-        screenshot_path = f"screenshots/{int(time.time())}.png"
+        screenshot_path = f"screenshots/{time.time_ns()}.png"
         os.makedirs("screenshots", exist_ok=True)
         driver.save_screenshot(screenshot_path)
         
         # Get business name for the analyzer
-        business_name = driver.find_element(By.CSS_SELECTOR, 'h1').text
+        business_name = heading.text
         
         # Use Gemini to analyze the screenshot and extract data
         business_data = analyzer.analyze_business_screenshot(screenshot_path, business_name)
@@ -1005,36 +1506,42 @@ def scrape_business(driver, url, analyzer):
         return None
 
 def scrape_search_results(search_term, location):
+    from gemini_analyzer import GeminiAnalyzer
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    
     analyzer = GeminiAnalyzer()
-    driver = setup_driver()
     
     try:
-        # Format the search URL
-        search_url = f"https://www.goldenpages.ie/q/{search_term}/{location}/"
-        driver.get(search_url)
-        time.sleep(2)
-        
-        # Get all business links
-        business_links = driver.find_elements(By.CSS_SELECTOR, '.listing h2 a')
-        business_urls = [link.get_attribute('href') for link in business_links]
-        
-        print(f"Found {len(business_urls)} businesses to process")
-        
-        # Process each business
-        for url in business_urls:
-            print(f"Processing business at {url}")
-            business_data = scrape_business(driver, url, analyzer)
-            if business_data:
-                print(f"Successfully processed business: {business_data.get('name', 'Unknown')}")
+        # Borrow a warm driver from the pool instead of launching Chrome per search.
+        # Images stay on: Gemini reads screenshots of the business pages.
+        with get_driver_pool().driver(allow=('images',)) as driver:
+            # Format the search URL
+            search_url = f"{GOLDEN_PAGES_BASE_URL}/q/{search_term}/{location}/"
+            driver.get(search_url)
+            try:
+                wait_for_element(driver, '.listing h2 a')
+            except TimeoutException:
+                print("No listings found or page took too long to load")
+            
+            # Get all business links
+            business_links = driver.find_elements(By.CSS_SELECTOR, '.listing h2 a')
+            business_urls = [link.get_attribute('href') for link in business_links]
+            
+            print(f"Found {len(business_urls)} businesses to process")
+            
+            # Process each business
+            for url in business_urls:
+                print(f"Processing business at {url}")
+                business_data = scrape_business(driver, url, analyzer)
+                if business_data:
+                    print(f"Successfully processed business: {business_data.get('name', 'Unknown')}")
         
         # Save all processed businesses to CSV
         analyzer.save_to_csv(f"results_{search_term}_{location}.csv")
         
     except Exception as e:
         print(f"Error during scraping: {e}")
-    
-    finally:
-        driver.quit()
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5007))
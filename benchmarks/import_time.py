@@ -0,0 +1,68 @@
+"""
+Import-time and idle-memory benchmark for a web worker.
+
+    python -m benchmarks.import_time              # import app, 5 runs
+    python -m benchmarks.import_time --runs 10 --request /
+
+Each run starts a fresh interpreter, imports the module (as a gunicorn
+worker does), optionally serves one request through the Flask test client,
+and reports the wall time, peak RSS and which heavy dependencies ended up
+loaded.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HEAVY_MODULES = [
+    'pandas', 'google.generativeai', 'PIL', 'selenium', 'webdriver_manager',
+    'bs4', 'lxml', 'httpx', 'requests',
+]
+
+PROBE = r'''
+import json, resource, sys, time
+started = time.perf_counter()
+module = __import__(sys.argv[1])
+imported = time.perf_counter() - started
+if sys.argv[2]:
+    module.app.test_client().get(sys.argv[2])
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    'import_seconds': imported,
+    'peak_rss_mb': rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024,
+    'loaded': [name for name in json.loads(sys.argv[3]) if name in sys.modules],
+}))
+'''
+
+
+def probe(module: str, path: str, env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE, module, path or '', json.dumps(HEAVY_MODULES)],
+        capture_output=True, text=True, env=env, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure worker import time and idle memory')
+    parser.add_argument('--module', default='app', help='Module a worker imports')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--request', help='Also serve one GET for this path, e.g. /')
+    args = parser.parse_args()
+
+    env = dict(os.environ, GEMLEADS_DATA_DIR=tempfile.mkdtemp(prefix='gemleads-import-'))
+    runs = [probe(args.module, args.request, env) for _ in range(args.runs)]
+
+    times = [run['import_seconds'] for run in runs]
+    rss = [run['peak_rss_mb'] for run in runs]
+    print(f"import {args.module}: median {statistics.median(times) * 1000:.0f} ms "
+          f"(min {min(times) * 1000:.0f}, max {max(times) * 1000:.0f}) over {args.runs} runs")
+    print(f"peak RSS: median {statistics.median(rss):.1f} MB")
+    print(f"heavy modules loaded: {', '.join(runs[-1]['loaded']) or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+"""
+Microbenchmarks for the extraction and validation hot paths.
+
+    python -m benchmarks.micro                    # compare with benchmarks/baselines.json
+    python -m benchmarks.micro --save-baseline    # record new baselines
+    python -m benchmarks.micro --archive fixtures/goldenpages   # use recorded pages
+
+Each case is timed over the whole corpus for several rounds and reports the
+median and p95 per-call latency, calls (or pages) per second and the peak
+memory allocated per call. The run exits non-zero when a case is slower or
+allocates more than its baseline allows.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Sequence
+from unittest import mock
+
+from extractors import element_text, extract_details, parse_html
+from http_cache import build_response
+from recognizers import recognizer
+from replay_server import FixtureArchive
+from benchmarks.synthetic_site import SyntheticSite
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), 'baselines.json')
+
+
+class Case:
+    """One benchmarked function and the inputs it is called with, one call per input."""
+
+    def __init__(self, name: str, func: Callable, inputs: Sequence, unit: str = 'calls'):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.unit = unit
+
+
+class Corpus:
+    """Detail pages plus the text, URLs, emails and locations derived from them."""
+
+    def __init__(self, pages: Dict[str, bytes], source: str):
+        self.pages = pages
+        self.source = source
+        self.texts = []
+        self.websites = []
+        self.emails = []
+        self.locations = []
+
+        for content in pages.values():
+            self.texts.append(element_text(parse_html(content), separator=' '))
+
+        for content in pages.values():
+            details = extract_details(content)
+            self.websites.append(details.get('website') or '')
+            self.emails.extend([details.get('email', '')] + details.get('additional_emails', []))
+            self.locations.append(details.get('location') or '')
+
+        # Shapes the cleaners exist for: numbered info@ prefixes, doubled suffixes,
+        # tracking links and Golden Pages' own URLs
+        self.emails.extend(['123info@example.ie', 'info@example.ie.ie', 'sales@example.com.com', 'not-an-email'])
+        self.websites.extend(['https://www.goldenpages.ie/business/1', 'https://example.ie/click.php?id=1',
+                              'https://example.ie/logo.png', 'mailto:info@example.ie'])
+
+    @classmethod
+    def from_archive(cls, path: str) -> 'Corpus':
+        archive = FixtureArchive(path)
+        pages = {}
+        for request_path in archive.paths():
+            if request_path.startswith('/business/') and 'sitemap' not in request_path:
+                status, _, body = archive.get(request_path)
+                if status == 200:
+                    pages[request_path] = body
+        return cls(pages, f"archive {path}")
+
+    @classmethod
+    def synthetic(cls, size: int) -> 'Corpus':
+        site = SyntheticSite(listings=size)
+        pages = {path: site.get(path)[2] for path in site.detail_paths()}
+        return cls(pages, f"synthetic ({size} pages)")
+
+
+def build_cases(corpus: Corpus) -> List[Case]:
+    import app
+    from app import GoldenPagesScraper
+    from gemini_analyzer import GeminiAnalyzer
+    from normalizers import clean_email
+
+    # Without the render policy and HTTP cache nothing is read from or written
+    # to the SQLite stores in DATA_DIR, which would also skew the timings
+    with contextlib.redirect_stdout(io.StringIO()), \
+            mock.patch.multiple(app, RENDER_FALLBACK=False, HTTP_CACHE_ENABLED=False):
+        scraper = GoldenPagesScraper(base_url='http://benchmark.invalid')
+
+    # Serve the corpus in place of the network, so only extraction is measured
+    responses = {f"{scraper.base_url}{path}": build_response(f"{scraper.base_url}{path}", 200, {}, content)
+                 for path, content in corpus.pages.items()}
+    scraper.make_request_with_retry = responses.get
+
+    # clean_domain and abbreviate_emails never touch the Gemini API, so skip
+    # configuring a client
+    analyzer = GeminiAnalyzer.__new__(GeminiAnalyzer)
+    email_batches = [corpus.emails[i:i + 10] for i in range(0, len(corpus.emails), 10)]
+
+    return [
+        Case('extract_business_details', lambda url: scraper.extract_business_details(url, 'Dublin'),
+             responses, unit='pages'),
+        Case('extract_email_from_text', scraper.extract_email_from_text, corpus.texts, unit='pages'),
+        Case('recognizer.scan', recognizer.scan, corpus.texts, unit='pages'),
+        Case('is_valid_website', scraper.is_valid_website, corpus.websites),
+        Case('is_valid_email', scraper.is_valid_email, corpus.emails),
+        Case('extract_county', scraper.extract_county, corpus.locations),
+        Case('clean_email', clean_email, corpus.emails),
+        Case('GeminiAnalyzer.clean_domain', analyzer.clean_domain, corpus.emails),
+        Case('GeminiAnalyzer.abbreviate_emails', analyzer.abbreviate_emails, email_batches, unit='batches'),
+    ]
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def measure(case: Case, rounds: int, min_time: float) -> Dict:
+    """Time ``rounds`` passes over the case's inputs and trace one more for allocations."""
+    func = case.func
+    per_call = []
+
+    with contextlib.redirect_stdout(io.StringIO()) as captured:
+        for value in case.inputs[:5]:
+            func(value)  # Warm up caches and lazy imports
+
+        deadline = time.perf_counter() + min_time
+        completed = 0
+        while completed < rounds or time.perf_counter() < deadline:
+            for value in case.inputs:
+                started = time.perf_counter()
+                func(value)
+                per_call.append(time.perf_counter() - started)
+            completed += 1
+            captured.seek(0)
+            captured.truncate()
+
+        peaks = []
+        tracemalloc.start()
+        for value in case.inputs:
+            tracemalloc.reset_peak()
+            baseline_size = tracemalloc.get_traced_memory()[0]
+            func(value)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline_size)
+        tracemalloc.stop()
+
+    median = statistics.median(per_call)
+    return {
+        'unit': case.unit,
+        'calls': len(per_call),
+        'median_us': round(median * 1e6, 2),
+        'p95_us': round(_percentile(per_call, 0.95) * 1e6, 2),
+        'per_second': round(1 / median, 1) if median else None,
+        'peak_kb': round(statistics.mean(peaks) / 1024, 2),
+    }
+
+
+def compare(results: Dict[str, Dict], baselines: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Describe every case that regressed past ``tolerance`` (a fraction) of its baseline."""
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if not baseline:
+            continue
+        for metric in ('median_us', 'peak_kb'):
+            allowed = baseline[metric] * (1 + tolerance)
+            if result[metric] > allowed and result[metric] - baseline[metric] > 1:
+                regressions.append(
+                    f"{name}: {metric} {result[metric]} exceeds baseline {baseline[metric]} by more than {tolerance:.0%}"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmarks for extraction and validation')
+    parser.add_argument('--archive', help='Fixture archive recorded with replay_server.py')
+    parser.add_argument('--pages', type=int, default=200, help='Synthetic corpus size when no archive is given')
+    parser.add_argument('--rounds', type=int, default=5, help='Minimum passes over the corpus per case')
+    parser.add_argument('--min-time', type=float, default=1.0, help='Minimum seconds spent timing each case')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown before failing')
+    parser.add_argument('--baselines', default=BASELINES_PATH, help='Baseline file to compare with or save')
+    parser.add_argument('--save-baseline', action='store_true', help='Write these results as the new baselines')
+    parser.add_argument('--only', help='Run only cases whose name contains this text')
+    args = parser.parse_args()
+
+    corpus = Corpus.from_archive(args.archive) if args.archive else Corpus.synthetic(args.pages)
+    if not corpus.pages:
+        print(f"No detail pages in {corpus.source}")
+        sys.exit(2)
+    print(f"Corpus: {corpus.source}, {len(corpus.pages)} detail pages")
+
+    results = {}
+    print(f"{'case':<34}{'median':>12}{'p95':>12}{'per sec':>16}{'peak alloc':>12}")
+    for case in build_cases(corpus):
+        if args.only and args.only not in case.name:
+            continue
+        result = measure(case, args.rounds, args.min_time)
+        results[case.name] = result
+        print(f"{case.name:<34}{result['median_us']:>10.1f}us{result['p95_us']:>10.1f}us"
+              f"{result['per_second']:>9.0f} {case.unit:<7}{result['peak_kb']:>11.1f}KB")
+
+    if args.save_baseline:
+        saved = {}
+        if os.path.exists(args.baselines):
+            with open(args.baselines, encoding='utf-8') as f:
+                saved = json.load(f)
+        saved.setdefault('cases', {}).update(results)
+        saved['environment'] = {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'corpus': corpus.source,
+        }
+        with open(args.baselines, 'w', encoding='utf-8') as f:
+            json.dump(saved, f, indent=2, sort_keys=True)
+        print(f"Saved baselines to {args.baselines}")
+        return
+
+    if not os.path.exists(args.baselines):
+        print("No baselines yet; run with --save-baseline to record them")
+        return
+
+    with open(args.baselines, encoding='utf-8') as f:
+        baselines = json.load(f).get('cases', {})
+    regressions = compare(results, baselines, args.tolerance)
+    if regressions:
+        print("\nPerformance regressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("\nNo regressions against baselines")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+End-to-end throughput benchmark for the scraping pipeline.
+
+    python -m benchmarks.pipeline --listings 2000 --latency 0.08 --min-interval 0.02
+    python -m benchmarks.pipeline --scenario sitemap --sitemap-businesses 100 --sitemap-format xml
+
+Runs scrape_business_data() and/or scrape_entire_sitemap() against a local
+ReplayServer serving a SyntheticSite, and reports wall time, pages/sec,
+businesses/sec, peak RSS, the split of time across fetch, parse, extract
+and write, and the highest request rate the server saw compared with the
+configured per-host rate.
+
+Settings are read from the environment at import time, so the options
+below are exported before the application modules are imported.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def peak_request_rate(times: List[float], window: float) -> float:
+    """Highest request rate seen over any ``window`` seconds, in requests per second."""
+    times = sorted(times)
+    busiest, start = 0, 0
+    for end, moment in enumerate(times):
+        while moment - times[start] > window:
+            start += 1
+        busiest = max(busiest, end - start)
+    # Intervals between requests, so a perfectly paced run reads as the configured rate
+    return busiest / window
+
+
+def summarize(name: str, scraper, server, wall: float, businesses: int, ceiling: float) -> Dict:
+    stages = {stage: round(seconds, 3) for stage, seconds in sorted(scraper.stage_times.items())}
+    stages['other'] = round(max(wall - sum(scraper.stage_times.values()), 0.0), 3)
+    window = max(5 / ceiling, 1.0) if ceiling else 1.0
+    with server.stats_lock:
+        pages, request_times = server.requests_served, list(server.request_times)
+    return {
+        'scenario': name,
+        'wall_seconds': round(wall, 2),
+        'pages': pages,
+        'pages_per_second': round(pages / wall, 2),
+        'businesses': businesses,
+        'businesses_per_second': round(businesses / wall, 2),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'stage_seconds': stages,
+        'peak_request_rate': round(peak_request_rate(request_times, window), 2),
+        'configured_rate': round(ceiling, 2),
+    }
+
+
+def run_search(scraper, server, what: str, where: str, ceiling: float) -> Dict:
+    server.reset_stats()
+    started = time.perf_counter()
+    filename, message = scraper.scrape_business_data(what, where)
+    wall = time.perf_counter() - started
+
+    if filename:
+        output = os.path.join(scraper.downloads_dir, filename)
+        if os.path.exists(output):
+            os.remove(output)
+    else:
+        print(f"Search scenario failed: {message}", file=sys.stderr)
+    return summarize('search', scraper, server, wall, scraper.successful_scrapes, ceiling)
+
+
+def run_sitemap(scraper, server, max_businesses: int, sitemap_format: str, ceiling: float) -> Dict:
+    server.reset_stats()
+    path = '/sitemap.xml' if sitemap_format == 'xml' else '/business/sitemap'
+    started = time.perf_counter()
+    filename, stats, errors = scraper.scrape_entire_sitemap(max_businesses=max_businesses,
+                                                            sitemap_url=f"{scraper.base_url}{path}")
+    wall = time.perf_counter() - started
+
+    if filename:
+        output = os.path.join(scraper.downloads_dir, filename)
+        if os.path.exists(output):
+            os.remove(output)
+    else:
+        print(f"Sitemap scenario failed: {errors}", file=sys.stderr)
+    businesses = stats['successful'] if isinstance(stats, dict) else 0
+    return summarize('sitemap', scraper, server, wall, businesses, ceiling)
+
+
+def print_report(result: Dict):
+    print(f"\n== {result['scenario']} ==")
+    print(f"wall time          {result['wall_seconds']:>10.2f} s")
+    print(f"pages              {result['pages']:>10} ({result['pages_per_second']:.2f}/s)")
+    print(f"businesses         {result['businesses']:>10} ({result['businesses_per_second']:.2f}/s)")
+    print(f"peak RSS           {result['peak_rss_mb']:>10.1f} MB")
+    for stage, seconds in result['stage_seconds'].items():
+        share = seconds / result['wall_seconds'] * 100 if result['wall_seconds'] else 0
+        print(f"  {stage:<16} {seconds:>10.2f} s ({share:.0f}%)")
+    print(f"peak request rate  {result['peak_request_rate']:>10.2f}/s (configured {result['configured_rate']:.2f}/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end scraping throughput benchmark')
+    parser.add_argument('--scenario', choices=('search', 'sitemap', 'both'), default='search')
+    parser.add_argument('--listings', type=int, default=2000, help='Synthetic businesses in the search')
+    parser.add_argument('--per-page', type=int, default=20, help='Listings per results page')
+    parser.add_argument('--what', default='plumber')
+    parser.add_argument('--where', default='Dublin')
+    parser.add_argument('--sitemap-businesses', type=int, default=50, help='Businesses scraped from the sitemap')
+    parser.add_argument('--sitemap-format', choices=('html', 'xml'), default='html',
+                        help='Crawl the HTML sitemap page or the XML sitemap index')
+    parser.add_argument('--latency', type=float, default=0.08, help='Server latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.03, help='Random +/- latency in seconds')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Fraction of requests answered with 429')
+    parser.add_argument('--min-interval', type=float, default=0.02, help='Per-host seconds between requests')
+    parser.add_argument('--cache', action='store_true', help='Keep the HTTP cache enabled')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='Also write the results to this file')
+    parser.add_argument('--verbose', action='store_true', help="Show the scraper's own output")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix='gemleads-bench-data-')
+    os.environ['GEMLEADS_DATA_DIR'] = data_dir
+    os.environ['GEMLEADS_FETCH_MIN_INTERVAL'] = str(args.min_interval)
+    if not args.cache:
+        os.environ['GEMLEADS_HTTP_CACHE'] = '0'
+
+    from app import GoldenPagesScraper
+    from replay_server import ReplayServer
+    from benchmarks.synthetic_site import SyntheticSite
+
+    site = SyntheticSite(listings=args.listings, per_page=args.per_page,
+                         what=args.what, where=args.where, seed=args.seed)
+    server = ReplayServer(site, latency=args.latency, jitter=args.jitter,
+                          rate_429=args.rate_429, seed=args.seed)
+    base_url = server.start()
+    ceiling = 1 / args.min_interval if args.min_interval > 0 else 0.0
+    print(f"Serving {args.listings} synthetic listings ({site.pages} pages) at {base_url}, "
+          f"latency {args.latency}s +/- {args.jitter}s")
+
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    results = []
+    try:
+        with quiet:
+            scraper = GoldenPagesScraper(base_url=base_url)
+            if args.scenario in ('search', 'both'):
+                results.append(run_search(scraper, server, args.what, args.where, ceiling))
+            if args.scenario in ('sitemap', 'both'):
+                results.append(run_sitemap(scraper, server, args.sitemap_businesses, args.sitemap_format, ceiling))
+    finally:
+        server.stop()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    for result in results:
+        print_report(result)
+        if ceiling and result['peak_request_rate'] > ceiling * 1.05:
+            print(f"WARNING: {result['scenario']} exceeded the configured per-host rate")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""
+Deterministic synthetic Golden Pages site for benchmarks.
+
+``SyntheticSite`` generates search result pages, detail pages and sitemaps
+(an HTML page, and an XML sitemap index with its urlsets) on demand with the same markup the scraper reads from the live site, plus
+the navigation, script and footer boilerplate that makes real pages heavy.
+It has the same ``get(path)`` interface as ``FixtureArchive``, so it can be
+served by ``replay_server.ReplayServer``.
+"""
+import random
+import re
+import urllib.parse
+from typing import List, Optional, Tuple
+
+from replay_server import Page
+
+COUNTIES = [
+    'Carlow', 'Cavan', 'Clare', 'Cork', 'Donegal', 'Dublin', 'Galway', 'Kerry',
+    'Kildare', 'Kilkenny', 'Laois', 'Limerick', 'Louth', 'Mayo', 'Meath', 'Wexford'
+]
+STREETS = ['Main St', 'Church Rd', 'Bridge St', 'Market Sq', 'Station Rd', 'Castle St', 'Green Ln']
+WORDS = ['Express', 'Quality', 'Reliable', 'Family', 'Premier', 'City', 'Local', 'Expert', 'Rapid']
+
+HTML_TYPE = 'text/html; charset=utf-8'
+SEARCH_PATH = re.compile(r'^/q/business/advanced/where/([^/]+)/what/([^/]+)/(\d+)$')
+DETAIL_PATH = re.compile(r'^/business/(\d+)-')
+URLSET_PATH = re.compile(r'^/sitemap-(\d+)\.xml$')
+XML_TYPE = 'application/xml'
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+URLS_PER_SITEMAP = 1000
+
+
+def _boilerplate(rng: random.Random) -> Tuple[str, str]:
+    """Site chrome around every page (menus, tracking scripts, footer links) as (header, footer)."""
+    menu = ''.join(f'<li><a href="/q/{word.lower()}/{rng.randint(1, 999)}">{word} services</a></li>'
+                   for word in rng.choices(WORDS, k=150))
+    script = '<script>window.dataLayer=window.dataLayer||[];' + 'dataLayer.push({"event":"pv"});' * 400 + '</script>'
+    footer = ''.join(f'<a href="https://www.{site}.com/goldenpages">{site}</a>'
+                     for site in ('facebook', 'twitter', 'linkedin', 'instagram', 'youtube'))
+    return f'<header><nav><ul>{menu}</ul></nav></header>{script}', f'<footer>{footer}<p>&copy; Golden Pages</p></footer>'
+
+
+class SyntheticSite:
+    """
+    ``listings`` businesses for one search, ``per_page`` to a results page.
+
+    Two thirds of the businesses are in the searched county and the rest in
+    neighbouring ones, so county filtering has work to do. Every page is
+    generated from ``seed``, so runs are reproducible.
+    """
+
+    def __init__(self, listings: int = 2000, per_page: int = 20, what: str = 'plumber',
+                 where: str = 'Dublin', seed: int = 0):
+        self.listings = listings
+        self.per_page = per_page
+        self.what = what
+        self.where = where
+        self.seed = seed
+
+    @property
+    def pages(self) -> int:
+        return max((self.listings + self.per_page - 1) // self.per_page, 1)
+
+    def _business(self, index: int):
+        rng = random.Random(self.seed * 1000003 + index)
+        county = self.where if rng.random() < 0.67 else rng.choice(COUNTIES)
+        name = f"{rng.choice(WORDS)} {self.what.title()} {index}"
+        slug = urllib.parse.quote(name.lower().replace(' ', '-'))
+        domain = f"{rng.choice(WORDS).lower()}{self.what.lower()}{index}"
+        return rng, {
+            'index': index,
+            'name': name,
+            'url': f"/business/{index}-{slug}",
+            'address': f"{rng.randint(1, 200)} {rng.choice(STREETS)}, {county}",
+            'categories': f"{self.what.title()}s, Heating Engineers",
+            'phone': f"0{rng.randint(1, 99)} {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+            'mobile': f"08{rng.randint(3, 9)} {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+            'email': f"info@{domain}.ie",
+            'website': f"https://www.{domain}.ie",
+        }
+
+    def search_page(self, page: int) -> Optional[bytes]:
+        if page < 1 or page > self.pages:
+            return None
+        rng = random.Random(self.seed * 7919 + page)
+        header, footer = _boilerplate(rng)
+        first = (page - 1) * self.per_page
+        cards = []
+        for index in range(first, min(first + self.per_page, self.listings)):
+            _, business = self._business(index)
+            cards.append(
+                f'<div class="listing_container"><h3 class="listing_title">'
+                f'<span>{index - first + 1}</span><a href="{business["url"]}">{business["name"]}</a></h3>'
+                f'<div class="listing_address">{business["address"]}</div>'
+                f'<div class="listing_categories">{business["categories"]}</div>'
+                f'<a class="listing_phone" href="tel:{business["phone"]}">Call</a></div>'
+            )
+        next_button = ''
+        if page < self.pages:
+            next_button = (f'<button class="btn_normal btn_pagination clickable" id="btn_pagination_next" '
+                           f'data-url="/q/business/advanced/where/{self.where}/what/{self.what}/{page + 1}">Next</button>')
+        body = (f'<html><head><title>{self.what} in {self.where}</title></head><body>{header}'
+                f'<div class="results_info">{first + 1} - {first + len(cards)} of {self.listings} results</div>'
+                f'{"".join(cards)}{next_button}{footer}</body></html>')
+        return body.encode('utf-8')
+
+    def detail_page(self, index: int) -> Optional[bytes]:
+        if index < 0 or index >= self.listings:
+            return None
+        rng, business = self._business(index)
+        header, footer = _boilerplate(rng)
+        # Some businesses only publish an obfuscated email in their description
+        if rng.random() < 0.3:
+            email_markup = f'<p class="description">Email us at {business["email"].replace("@", " [at] ")}</p>'
+        else:
+            email_markup = f'<a class="email" href="mailto:{business["email"]}">Email</a>'
+        body = (
+            f'<html><head><title>{business["name"]}</title></head><body>{header}'
+            f'<h1>{business["name"]}</h1>'
+            f'<div class="contact_details"><a class="phone" href="tel:{business["phone"]}">{business["phone"]}</a>'
+            f'<span class="mobile">Mobile: {business["mobile"]}</span>{email_markup}</div>'
+            f'<a class="website" href="{business["website"]}"><i class="globe"></i>Visit website</a>'
+            f'<div class="address">{business["address"]}</div>'
+            f'<div class="categories">{business["categories"]}</div>'
+            f'<p>{" ".join(rng.choice(WORDS) for _ in range(200))}</p>'
+            f'{footer}</body></html>'
+        )
+        return body.encode('utf-8')
+
+    def sitemap(self) -> bytes:
+        businesses = (self._business(index)[1] for index in range(self.listings))
+        links = ''.join(f'<li><a href="{business["url"]}">{business["name"]}</a></li>' for business in businesses)
+        return f'<html><body><h1>Business sitemap</h1><ul>{links}</ul></body></html>'.encode('utf-8')
+
+    def sitemap_index(self) -> bytes:
+        count = max((self.listings + URLS_PER_SITEMAP - 1) // URLS_PER_SITEMAP, 1)
+        entries = ''.join(f'<sitemap><loc>/sitemap-{number}.xml</loc></sitemap>' for number in range(1, count + 1))
+        return f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex xmlns="{SITEMAP_NS}">{entries}</sitemapindex>'.encode('utf-8')
+
+    def urlset(self, number: int) -> Optional[bytes]:
+        start = (number - 1) * URLS_PER_SITEMAP
+        if number < 1 or start >= max(self.listings, 1):
+            return None
+        entries = ''.join(f'<url><loc>{self._business(index)[1]["url"]}</loc><lastmod>2024-01-01</lastmod></url>'
+                          for index in range(start, min(start + URLS_PER_SITEMAP, self.listings)))
+        return f'<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="{SITEMAP_NS}">{entries}</urlset>'.encode('utf-8')
+
+    def detail_paths(self) -> List[str]:
+        return [self._business(index)[1]['url'] for index in range(self.listings)]
+
+    def get(self, path: str) -> Optional[Page]:
+        """Return (status, content type, body) for a request path, or None if unknown."""
+        path = urllib.parse.unquote(path.split('?', 1)[0])
+        body = None
+
+        match = SEARCH_PATH.match(path)
+        if match:
+            body = self.search_page(int(match.group(3)))
+        elif path.rstrip('/') == '/business/sitemap':
+            body = self.sitemap()
+        elif path == '/sitemap.xml':
+            return 200, XML_TYPE, self.sitemap_index()
+        elif URLSET_PATH.match(path):
+            body = self.urlset(int(URLSET_PATH.match(path).group(1)))
+            return (200, XML_TYPE, body) if body is not None else None
+        else:
+            match = DETAIL_PATH.match(path)
+            if match:
+                body = self.detail_page(int(match.group(1)))
+
+        return (200, HTML_TYPE, body) if body is not None else None
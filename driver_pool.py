@@ -0,0 +1,284 @@
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, List, Optional
+
+from settings import (
+    DRIVER_POOL_SIZE, DRIVER_MAX_PAGES, DRIVER_MAX_RSS_MB, DRIVER_ACQUIRE_TIMEOUT,
+    DRIVER_LAUNCH_RETRY_AFTER, DRIVER_BLOCK_RESOURCES, DRIVER_WAIT_TIMEOUT
+)
+
+
+def _extension_patterns(*extensions: str) -> List[str]:
+    # Blocklist patterns match the whole URL, so versioned assets such as
+    # logo.png?v=3 need a second pattern for the query string
+    return [pattern for extension in extensions for pattern in (f'*.{extension}', f'*.{extension}?*')]
+
+
+# URL patterns blocked through CDP, by resource kind. Chrome's blocklist only
+# takes wildcards, so third-party requests are matched by known ad/tracker hosts.
+BLOCKED_RESOURCES = {
+    'images': _extension_patterns('png', 'jpg', 'jpeg', 'gif', 'webp', 'svg', 'ico', 'avif'),
+    'fonts': _extension_patterns('woff', 'woff2', 'ttf', 'otf', 'eot'),
+    'media': _extension_patterns('mp4', 'webm', 'mp3', 'ogg', 'm3u8'),
+    'third_party': [
+        '*google-analytics.com*', '*googletagmanager.com*', '*googlesyndication.com*',
+        '*doubleclick.net*', '*adservice.google.*', '*facebook.net*', '*connect.facebook.*',
+        '*hotjar.com*', '*clarity.ms*', '*scorecardresearch.com*', '*quantserve.com*',
+        '*criteo.*', '*taboola.com*', '*outbrain.com*', '*adnxs.com*', '*cookielaw.org*',
+        '*onetrust.com*', '*youtube.com/embed*', '*maps.googleapis.com*',
+    ],
+}
+
+
+class DriverPoolTimeout(Exception):
+    """Raised when no Chrome driver became free within the acquire timeout."""
+
+
+class DriverUnavailable(Exception):
+    """Raised while Chrome is not retried after a failed launch."""
+
+
+def chrome_options():
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    # Return from driver.get() at DOMContentLoaded; callers wait for the element they need
+    options.page_load_strategy = 'eager'
+    options.add_argument('--headless')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--window-size=1920,1080')  # Large enough for screenshots
+    return options
+
+
+def block_resources(driver, allow: Iterable[str] = ()):
+    """
+    Stop Chrome fetching images, fonts, media and trackers, except the kinds in ``allow``.
+
+    Applies to every page the driver loads until called again. Drivers
+    without CDP support are left alone.
+    """
+    if not hasattr(driver, 'execute_cdp_cmd'):
+        return
+    patterns = [pattern for kind, kind_patterns in BLOCKED_RESOURCES.items()
+                if kind not in allow for pattern in kind_patterns]
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+
+
+def wait_for_element(driver, css_selector: str, timeout: float = DRIVER_WAIT_TIMEOUT):
+    """Wait until an element matching ``css_selector`` is in the DOM and return it."""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    return WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, css_selector)))
+
+
+def wait_for_page_load(driver, timeout: float = DRIVER_WAIT_TIMEOUT):
+    """Wait for the load event, i.e. until images and other subresources have arrived."""
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    WebDriverWait(driver, timeout).until(lambda d: d.execute_script('return document.readyState') == 'complete')
+
+
+def process_tree_rss_mb(pid: int) -> Optional[float]:
+    """Resident memory of a process and all its descendants, read from /proc. None if unavailable."""
+    total_kb = 0
+    pending = [pid]
+    try:
+        while pending:
+            current = pending.pop()
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    pending.extend(int(child) for child in f.read().split())
+    except (OSError, ValueError):
+        if not total_kb:
+            return None
+    return total_kb / 1024
+
+
+class PooledDriver:
+    """A Chrome WebDriver plus the bookkeeping used to decide when to recycle it."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0  # Pages loaded, across every checkout
+        self.created_at = time.time()
+        # Count navigations rather than checkouts, since one checkout may load many pages
+        self._get = driver.get
+        driver.get = self._counted_get
+
+    def _counted_get(self, url):
+        self.pages += 1
+        return self._get(url)
+
+    def rss_mb(self) -> Optional[float]:
+        process = getattr(getattr(self.driver, 'service', None), 'process', None)
+        return process_tree_rss_mb(process.pid) if process else None
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception as e:
+            print(f"Error closing WebDriver: {e}")
+
+
+class DriverPool:
+    """
+    Lazily started, reusable headless Chrome drivers.
+
+    No browser is launched until ``driver()`` is first used. Drivers are
+    handed back to the pool after each use and reused by later jobs. A driver
+    is quit and replaced once it has loaded ``max_pages`` pages, or once Chrome's memory
+    exceeds ``max_rss_mb``. At most ``max_drivers`` run at once per process;
+    further callers wait up to ``acquire_timeout`` seconds for one to free up.
+    After a failed launch (e.g. Chrome is not installed) no new driver is
+    started for ``launch_retry_after`` seconds; callers get DriverUnavailable
+    at once instead of each paying for another failed launch.
+    """
+
+    def __init__(self, max_drivers: int = DRIVER_POOL_SIZE, max_pages: int = DRIVER_MAX_PAGES,
+                 max_rss_mb: float = DRIVER_MAX_RSS_MB, acquire_timeout: float = DRIVER_ACQUIRE_TIMEOUT,
+                 launch_retry_after: float = DRIVER_LAUNCH_RETRY_AFTER, factory: Optional[Callable] = None):
+        self.max_drivers = max_drivers
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.acquire_timeout = acquire_timeout
+        self.launch_retry_after = launch_retry_after
+        self.factory = factory or self._launch
+        self.idle: List[PooledDriver] = []
+        self.size = 0  # Idle plus checked-out drivers
+        self.condition = threading.Condition()
+        self.driver_path = None
+        self.launched = 0
+        self.recycled = 0
+        self.launch_failed_at = None  # time.monotonic() of the last failed launch
+
+    def _launch(self):
+        # Selenium is only imported once a browser is actually needed
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        # Resolve chromedriver once per process instead of on every launch
+        if self.driver_path is None:
+            self.driver_path = ChromeDriverManager().install()
+        return webdriver.Chrome(service=Service(self.driver_path), options=chrome_options())
+
+    def acquire(self) -> PooledDriver:
+        deadline = time.monotonic() + self.acquire_timeout
+        with self.condition:
+            while not self.idle and self.size >= self.max_drivers:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise DriverPoolTimeout(f"No Chrome driver free after {self.acquire_timeout}s")
+                self.condition.wait(remaining)
+            if self.idle:
+                return self.idle.pop()
+            if self.launch_failed_at is not None:
+                retry_in = self.launch_failed_at + self.launch_retry_after - time.monotonic()
+                if retry_in > 0:
+                    raise DriverUnavailable(f"Chrome failed to start, not retrying for another {retry_in:.0f}s")
+            self.size += 1  # Reserve the slot before the slow launch
+
+        try:
+            started = time.time()
+            pooled = PooledDriver(self.factory())
+            self.launched += 1
+            self.launch_failed_at = None
+            print(f"Started Chrome driver in {time.time() - started:.1f}s")
+            return pooled
+        except Exception as e:
+            print(f"Chrome driver failed to start, retrying in {self.launch_retry_after:.0f}s: {e}")
+            with self.condition:
+                self.size -= 1
+                self.launch_failed_at = time.monotonic()
+                self.condition.notify()
+            raise
+
+    def release(self, pooled: PooledDriver, broken: bool = False):
+        """Return a driver after use, quitting it if it is broken or due for recycling."""
+        recycle = broken or pooled.pages >= self.max_pages
+        if not recycle and self.max_rss_mb:
+            rss = pooled.rss_mb()
+            recycle = rss is not None and rss > self.max_rss_mb
+
+        if recycle:
+            pooled.quit()
+            self.recycled += 1
+
+        with self.condition:
+            if recycle:
+                self.size -= 1
+            else:
+                self.idle.append(pooled)
+            self.condition.notify()
+
+    @contextmanager
+    def driver(self, allow: Iterable[str] = ()):
+        """
+        Check out a driver for the duration of the block.
+
+        Unless DRIVER_BLOCK_RESOURCES is off, images, fonts, media and known
+        third-party hosts are blocked; pass e.g. ``allow=('images',)`` for
+        pages that are screenshotted.
+        """
+        from selenium.common.exceptions import TimeoutException
+
+        pooled = self.acquire()
+        broken = False
+        try:
+            if DRIVER_BLOCK_RESOURCES:
+                block_resources(pooled.driver, allow)
+            yield pooled.driver
+        except TimeoutException:
+            raise  # An element that never showed up says nothing about the session
+        except Exception:
+            # The session may be wedged; don't hand it to the next caller
+            broken = True
+            raise
+        finally:
+            self.release(pooled, broken)
+
+    def stats(self) -> dict:
+        with self.condition:
+            return {
+                'size': self.size,
+                'idle': len(self.idle),
+                'max_drivers': self.max_drivers,
+                'launched': self.launched,
+                'recycled': self.recycled,
+                'launch_failed': self.launch_failed_at is not None,
+            }
+
+    def close(self):
+        """Quit every idle driver."""
+        with self.condition:
+            idle, self.idle = self.idle, []
+            self.size -= len(idle)
+        for pooled in idle:
+            pooled.quit()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool() -> DriverPool:
+    """Return the process-wide driver pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool()
+            atexit.register(_pool.close)
+        return _pool
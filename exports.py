@@ -0,0 +1,89 @@
+import csv
+import json
+import os
+import zlib
+from typing import Iterable, Iterator, Optional
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available
+    zstandard = None
+
+from settings import DOWNLOADS_DIR
+
+CHUNK_SIZE = 64 * 1024
+ROWS_PER_CHUNK = 500
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def find_export(filename: str) -> Optional[str]:
+    """Return the path of an export file, or None. Only plain file names are accepted."""
+    if not filename or os.path.basename(filename) != filename or filename.startswith('.'):
+        return None
+    path = os.path.join(DOWNLOADS_DIR, filename)
+    return path if os.path.isfile(path) else None
+
+
+def supported_encodings():
+    """Content codings we can produce, in order of preference."""
+    return ['zstd', 'gzip'] if zstandard else ['gzip']
+
+
+def choose_encoding(accept_encodings) -> Optional[str]:
+    """
+    Pick a content coding from a parsed Accept-Encoding header.
+
+    Args:
+        accept_encodings: werkzeug ``request.accept_encodings``
+
+    Returns:
+        str: 'zstd', 'gzip', or None for an uncompressed response
+    """
+    match = accept_encodings.best_match(supported_encodings() + ['identity'], default='identity')
+    return None if match == 'identity' else match
+
+
+def iter_file(path: str) -> Iterator[bytes]:
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+def iter_ndjson(path: str) -> Iterator[bytes]:
+    """Re-encode a CSV export as newline-delimited JSON, one object per row."""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        lines = []
+        for row in csv.DictReader(f):
+            lines.append(json.dumps({key: value or None for key, value in row.items()}, ensure_ascii=False))
+            if len(lines) >= ROWS_PER_CHUNK:
+                yield ('\n'.join(lines) + '\n').encode('utf-8')
+                lines = []
+        if lines:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def compress(chunks: Iterable[bytes], encoding: Optional[str]) -> Iterator[bytes]:
+    """Compress a stream of chunks on the fly with the given content coding."""
+    if encoding is None:
+        yield from chunks
+        return
+
+    if encoding == 'zstd':
+        compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    elif encoding == 'gzip':
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    else:
+        raise ValueError(f"Unsupported content coding: {encoding}")
+
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
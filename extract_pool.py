@@ -0,0 +1,130 @@
+import atexit
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from settings import EXTRACT_WORKERS, EXTRACT_QUEUE_LIMIT
+
+
+def _context():
+    # Forking a process whose fetch and job threads hold locks is unsafe, so
+    # workers start from a fresh interpreter with the extractors preloaded
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['extractors'])
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+class ExtractPool:
+    """
+    Worker processes that turn detail page bodies into extracted fields.
+
+    Parsing and extraction are CPU-bound and hold the GIL, so done inline
+    they keep one core busy while the fetch loop waits on it. Bodies are
+    sent to worker processes instead and only the compact details dicts
+    come back. At most ``queue_limit`` pages are in flight per process:
+    ``submit()`` blocks until one finishes, which holds the fetch loop back
+    when extraction falls behind rather than piling up page bodies. The
+    workers are started on first use; with no workers pages are extracted
+    inline.
+    """
+
+    def __init__(self, workers: int = EXTRACT_WORKERS, queue_limit: int = EXTRACT_QUEUE_LIMIT):
+        self.workers = max(workers, 0)
+        self.queue_limit = max(queue_limit, 1)
+        self.slots = threading.BoundedSemaphore(self.queue_limit)
+        self.lock = threading.Lock()
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.blocked_seconds = 0.0  # Time callers spent waiting for a free slot
+
+    def _executor(self, broken: Optional[ProcessPoolExecutor] = None) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.executor is broken:
+                if broken is not None:
+                    print("An extract worker died, restarting the pool")
+                    broken.shutdown(wait=False)
+                self.executor = ProcessPoolExecutor(self.workers, mp_context=_context())
+                print(f"Started {self.workers} extract workers")
+            return self.executor
+
+    def _finished(self, future: Future):
+        with self.lock:
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+        self.slots.release()
+
+    def submit(self, content: bytes) -> Future:
+        """
+        Queue a detail page for extraction, waiting while the queue is full.
+
+        Returns:
+            Future: Resolves to the dict returned by ``extractors.extract_details``
+        """
+        from extractors import extract_details
+
+        started = time.perf_counter()
+        self.slots.acquire()
+        with self.lock:
+            self.blocked_seconds += time.perf_counter() - started
+            self.submitted += 1
+
+        try:
+            if self.workers:
+                executor = self.executor or self._executor()
+                try:
+                    future = executor.submit(extract_details, content)
+                except BrokenProcessPool:
+                    future = self._executor(broken=executor).submit(extract_details, content)
+            else:
+                future = Future()
+                try:
+                    future.set_result(extract_details(content))
+                except Exception as e:
+                    future.set_exception(e)
+        except Exception:
+            self.slots.release()
+            raise
+        future.add_done_callback(self._finished)
+        return future
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'workers': self.workers,
+                'started': self.executor is not None,
+                'queue_limit': self.queue_limit,
+                'in_flight': self.submitted - self.completed - self.failed,
+                'completed': self.completed,
+                'failed': self.failed,
+                'blocked_seconds': round(self.blocked_seconds, 3),
+            }
+
+    def close(self):
+        """Stop the workers, dropping pages that have not been started."""
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_extract_pool() -> ExtractPool:
+    """Return the process-wide extract pool, so concurrent scrapes share its workers and queue."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ExtractPool()
+            atexit.register(_pool.close)
+        return _pool
@@ -0,0 +1,169 @@
+import re
+from typing import Dict, List
+
+from lxml import etree
+from lxml import html as lxml_html
+
+from recognizers import recognizer
+
+HTML_PARSER = lxml_html.HTMLParser()
+
+# Text nodes below an element, skipping comments and script/style bodies
+TEXT_NODES = etree.XPath('.//text()[not(parent::script) and not(parent::style)]')
+
+# Elements inspected during the single pass over the document
+CANDIDATE_TAGS = ('h1', 'a', 'div', 'span', 'p')
+
+# Class-name hints, matched against the lower-cased class attribute
+PHONE_CLASS = re.compile(r'phone|tel|mobile|contact')
+EMAIL_CLASS = re.compile(r'mail|contact')
+ADDRESS_CLASS = re.compile(r'address')
+CATEGORY_CLASS = re.compile(r'categor')
+
+# Outbound links that are never the business's own website
+EXCLUDED_WEBSITE_HOSTS = ('goldenpages', 'facebook', 'twitter', 'linkedin')
+
+
+def parse_html(content):
+    """Parse raw page bytes (or text) into an lxml document."""
+    if isinstance(content, bytes):
+        try:
+            content = content.decode('utf-8')
+        except UnicodeDecodeError:
+            pass  # Let libxml2 use the charset declared by the page
+    return lxml_html.document_fromstring(content, parser=HTML_PARSER)
+
+
+def element_text(elem, strip=True, separator='') -> str:
+    """Element text, equivalent to BeautifulSoup's get_text(separator, strip)."""
+    texts = TEXT_NODES(elem)
+    if strip:
+        stripped = (text.strip() for text in texts)
+        return separator.join(text for text in stripped if text)
+    return separator.join(texts)
+
+
+def trim_email_domain(email: str) -> str:
+    """Cut an email after its first .com or .ie to drop trailing page junk."""
+    if '.com' in email:
+        return email.split('.com')[0] + '.com'
+    if '.ie' in email:
+        return email.split('.ie')[0] + '.ie'
+    return email
+
+
+def _unique(values: List[str]) -> List[str]:
+    return list(dict.fromkeys(value for value in values if value))
+
+
+def extract_details(content) -> Dict:
+    """
+    Extract business details from a detail page in a single pass.
+
+    The document is parsed once and every candidate element is visited once,
+    in document order. Class attributes are tested with precompiled patterns
+    instead of per-element Python callbacks, and anchors are only serialised
+    when their href already qualifies as a website link.
+
+    Args:
+        content (bytes|str): Raw detail page body
+
+    Returns:
+        Dict: Any of name, phone, additional_phones, email, additional_emails,
+              website, location and categories that were found
+    """
+    root = parse_html(content)
+
+    name = None
+    website = None
+    location = None
+    categories = None
+    tel_phones, text_phones = [], []
+    mailto_emails, text_emails = [], []
+
+    for elem in root.iter(*CANDIDATE_TAGS):
+        tag = elem.tag
+
+        if tag == 'h1':
+            if name is None:
+                name = element_text(elem, strip=False).strip()
+            continue
+
+        href = elem.get('href')
+        class_name = (elem.get('class') or '').lower()
+
+        if tag == 'a':
+            if href is None:
+                continue
+            if 'tel:' in href:
+                tel_phones.append(href.replace('tel:', '').strip())
+            if 'mailto:' in href:
+                email = trim_email_domain(href.replace('mailto:', '').strip())
+                if email:
+                    mailto_emails.append(email.lower())
+            if website is None:
+                lowered = href.lower()
+                if (lowered.startswith('http') and
+                        not any(host in lowered for host in EXCLUDED_WEBSITE_HOSTS)):
+                    markup = etree.tostring(elem, encoding='unicode', with_tail=False).lower()
+                    if 'website' in markup or 'globe' in markup:
+                        website = lowered
+            continue
+
+        if not class_name:
+            continue
+
+        wants_phone = PHONE_CLASS.search(class_name) is not None
+        wants_email = EMAIL_CLASS.search(class_name) is not None
+
+        if wants_phone and href and 'tel:' in href:
+            tel_phones.append(href.replace('tel:', '').strip())
+            wants_phone = False
+        if wants_email and href and 'mailto:' in href:
+            email = trim_email_domain(href.replace('mailto:', '').strip())
+            if email:
+                mailto_emails.append(email.lower())
+            wants_email = False
+
+        if wants_phone or wants_email:
+            # One recognizer scan covers both fields for "contact" blocks. Text
+            # nodes are space-separated so adjacent numbers are not glued.
+            emails, phones = recognizer.scan(element_text(elem, separator=' '))
+            if wants_phone:
+                text_phones.extend(phones)
+            if wants_email:
+                text_emails.extend(trim_email_domain(email) for email in emails)
+
+        if location is None and ADDRESS_CLASS.search(class_name):
+            location = element_text(elem)
+
+        if categories is None and tag != 'p' and CATEGORY_CLASS.search(class_name):
+            categories = element_text(elem)
+
+    details = {}
+
+    if name is not None:
+        details['name'] = name
+
+    phones = _unique(tel_phones + text_phones)
+    if phones:
+        details['phone'] = phones[0]
+        if len(phones) > 1:
+            details['additional_phones'] = phones[1:]
+
+    emails = _unique(mailto_emails + text_emails)
+    if emails:
+        details['email'] = emails[0]
+        if len(emails) > 1:
+            details['additional_emails'] = emails[1:]
+
+    if website:
+        details['website'] = website
+
+    if location is not None:
+        details['location'] = location
+
+    if categories is not None:
+        details['categories'] = categories
+
+    return details
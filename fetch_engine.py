@@ -0,0 +1,264 @@
+import asyncio
+import threading
+import time
+import urllib.parse
+import urllib.robotparser
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Iterable, Optional, Tuple
+
+import httpx
+import requests
+
+from http_cache import build_response
+from rate_controller import AdaptiveRateController
+from settings import (
+    FETCH_MIN_INTERVAL, FETCH_MAX_CONNECTIONS, FETCH_TIMEOUT,
+    FETCH_PREFETCH_LIMIT, FETCH_RESPECT_ROBOTS
+)
+
+# Seconds a prefetched response is kept waiting for its consumer
+PREFETCH_MAX_AGE = 300
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    ``reserve()`` takes a token and returns how long the caller has to wait
+    before using it. Tokens can be reserved ahead of time, so concurrent
+    callers queue up in order instead of all waking at once. With the default
+    capacity of 1, requests are spaced exactly ``1 / rate`` seconds apart.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def set_rate(self, rate: float):
+        with self.lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def reserve(self) -> float:
+        """Take a token and return the number of seconds to wait before using it."""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+def _host(url: str) -> str:
+    return urllib.parse.urlsplit(url).netloc.lower()
+
+
+class AsyncFetchEngine:
+    """
+    asyncio HTTP fetcher with per-host politeness.
+
+    Every host gets its own token bucket, limited to one request per
+    ``min_interval`` seconds, or to the robots.txt Crawl-delay if that is
+    stricter. An ``AdaptiveRateController`` slows the bucket down when the
+    host throttles or fails and speeds it back up after sustained success,
+    and holds requests back for any Retry-After. Responses come back as ``requests.Response`` objects and
+    transport errors as ``requests`` exceptions, so existing retry code works
+    unchanged.
+    """
+
+    def __init__(self, min_interval: float = FETCH_MIN_INTERVAL, timeout: float = FETCH_TIMEOUT,
+                 max_connections: int = FETCH_MAX_CONNECTIONS, respect_robots: bool = FETCH_RESPECT_ROBOTS,
+                 user_agent: str = '*'):
+        self.min_interval = min_interval
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.respect_robots = respect_robots
+        self.user_agent = user_agent
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.robots: Dict[str, Optional[urllib.robotparser.RobotFileParser]] = {}
+        self.robots_locks: Dict[str, asyncio.Lock] = {}
+        self.clients: Dict[Optional[str], httpx.AsyncClient] = {}
+        self.controller = AdaptiveRateController(
+            ceiling=1 / min_interval if min_interval > 0 else float('inf'),
+            on_rate_change=lambda host, rate: self.bucket(host).set_rate(rate)
+        )
+
+    def bucket(self, host: str) -> TokenBucket:
+        """Return the token bucket for a host, creating it on first use."""
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            rate = 1 / self.min_interval if self.min_interval > 0 else float('inf')
+            bucket = self.buckets.setdefault(host, TokenBucket(rate))
+        return bucket
+
+    def _client(self, proxy: Optional[str]) -> httpx.AsyncClient:
+        if proxy not in self.clients:
+            self.clients[proxy] = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                proxies=proxy,
+                limits=httpx.Limits(max_connections=self.max_connections)
+            )
+        return self.clients[proxy]
+
+    async def _apply_robots(self, url: str, proxy: Optional[str]):
+        """Fetch robots.txt once per host and slow the bucket down to its Crawl-delay."""
+        host = _host(url)
+        if host in self.robots:
+            return
+
+        lock = self.robots_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            if host in self.robots:
+                return
+
+            parts = urllib.parse.urlsplit(url)
+            robots_url = f"{parts.scheme}://{parts.netloc}/robots.txt"
+            parser = None
+            try:
+                await asyncio.sleep(self.bucket(host).reserve())
+                response = await self._client(proxy).get(robots_url)
+                if response.status_code == 200:
+                    parser = urllib.robotparser.RobotFileParser(robots_url)
+                    parser.parse(response.text.splitlines())
+            except httpx.HTTPError as e:
+                print(f"Could not read {robots_url}: {e}")
+
+            self.robots[host] = parser
+            delay = parser.crawl_delay(self.user_agent) if parser else None
+            if delay and float(delay) > self.min_interval:
+                print(f"Honouring robots.txt Crawl-delay of {delay}s for {host}")
+                self.controller.set_ceiling(host, 1 / float(delay))
+
+    async def wait_turn(self, host: str):
+        """Wait out any Retry-After block, then for a token from the host's bucket."""
+        while True:
+            blocked = self.controller.blocked_for(host)
+            if blocked > 0:
+                await asyncio.sleep(blocked)
+
+            delay = self.bucket(host).reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            # A throttle may have arrived while we were queued
+            if self.controller.blocked_for(host) == 0:
+                return
+
+    async def fetch(self, url: str, headers: Optional[Dict] = None, proxy: Optional[str] = None) -> requests.Response:
+        """Fetch a URL once, at the pace the host currently allows."""
+        if self.respect_robots:
+            await self._apply_robots(url, proxy)
+
+        host = _host(url)
+        await self.wait_turn(host)
+
+        try:
+            response = await self._client(proxy).get(url, headers=headers)
+        except httpx.TimeoutException as e:
+            self.controller.record_error(host)
+            raise requests.exceptions.Timeout(str(e) or f"Timed out fetching {url}")
+        except httpx.TransportError as e:
+            self.controller.record_error(host)
+            raise requests.exceptions.ConnectionError(str(e) or f"Could not connect to {url}")
+        except httpx.HTTPError as e:
+            raise requests.exceptions.RequestException(str(e))
+
+        self.controller.record_response(host, response.status_code, response.headers.get('retry-after'))
+        return build_response(str(response.url), response.status_code, dict(response.headers), response.content)
+
+    async def close(self):
+        for client in self.clients.values():
+            await client.aclose()
+        self.clients.clear()
+
+
+class FetchEngine:
+    """
+    Synchronous facade over ``AsyncFetchEngine``.
+
+    The event loop runs in a daemon thread, so blocking callers keep calling
+    ``get()`` while requests queued with ``prefetch()`` are already in flight.
+    This lets the scraper parse page N while page N+1 and the next detail
+    pages download.
+    """
+
+    def __init__(self, prefetch_limit: int = FETCH_PREFETCH_LIMIT, **engine_options):
+        self.engine = AsyncFetchEngine(**engine_options)
+        self.prefetch_limit = prefetch_limit
+        self.prefetched: 'OrderedDict[str, Tuple[Future, float]]' = OrderedDict()
+        self.lock = threading.Lock()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='gemleads-fetch', daemon=True)
+        self.thread.start()
+
+    def _submit(self, url: str, headers: Optional[Dict], proxy: Optional[str]) -> Future:
+        return asyncio.run_coroutine_threadsafe(self.engine.fetch(url, headers, proxy), self.loop)
+
+    def get(self, url: str, headers: Optional[Dict] = None, proxy: Optional[str] = None) -> requests.Response:
+        """Fetch a URL, reusing a matching prefetch if one is pending."""
+        with self.lock:
+            pending = self.prefetched.pop(url, None)
+        future = pending[0] if pending else self._submit(url, headers, proxy)
+        return future.result()
+
+    def prefetch(self, urls: Iterable[str], headers: Optional[Dict] = None, proxy: Optional[str] = None):
+        """Start fetching URLs in the background for later ``get()`` calls."""
+        with self.lock:
+            self._expire_prefetches()
+            for url in urls:
+                if url in self.prefetched:
+                    continue
+                if len(self.prefetched) >= self.prefetch_limit:
+                    break
+                self.prefetched[url] = (self._submit(url, headers, proxy), time.monotonic())
+
+    def _expire_prefetches(self):
+        # Drop responses nobody collected, e.g. from a scrape that failed
+        cutoff = time.monotonic() - PREFETCH_MAX_AGE
+        while self.prefetched:
+            url, (future, created_at) = next(iter(self.prefetched.items()))
+            if created_at > cutoff:
+                break
+            future.cancel()
+            del self.prefetched[url]
+
+    def discard(self, url: str):
+        """Drop a prefetched response that will not be used."""
+        with self.lock:
+            pending = self.prefetched.pop(url, None)
+        if pending:
+            pending[0].cancel()
+
+    def wait(self, url: str):
+        """Block until the host of ``url`` may be contacted again."""
+        asyncio.run_coroutine_threadsafe(self.engine.wait_turn(_host(url)), self.loop).result()
+
+    def rate_state(self) -> Dict[str, Dict]:
+        """Adaptive rate state of every host contacted by this process."""
+        return self.engine.controller.state()
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.engine.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_fetch_engine() -> FetchEngine:
+    """Return the process-wide fetch engine, so all scrapes share per-host limits."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = FetchEngine()
+        return _engine
@@ -0,0 +1,328 @@
+import hashlib
+import math
+import os
+import shutil
+import sqlite3
+import tempfile
+import urllib.parse
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from settings import FRONTIER_DIR, FRONTIER_BLOOM_CAPACITY, FRONTIER_MEMORY_LIMIT
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form used for deduplication: lowercase scheme and host, no default port or fragment."""
+    url = url.strip()
+    # Fast path for the usual case of a URL that is canonical already
+    scheme, separator, rest = url.partition('://')
+    host, slash, path = rest.partition('/')
+    if (separator and slash and scheme == scheme.lower() and host == host.lower()
+            and ':' not in host and '#' not in path):
+        return url
+
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    return urllib.parse.urlunsplit((scheme, host, parts.path or '/', parts.query, ''))
+
+
+def url_fingerprint(url: str) -> int:
+    """Signed 64-bit fingerprint of a normalised URL, so it fits an SQLite INTEGER."""
+    digest = hashlib.blake2b(normalize_url(url).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+class ScratchDir:
+    """
+    Directory under FRONTIER_DIR holding one crawl's frontier databases.
+
+    A crawl run as a job is given the job ID as ``name``. The directory is
+    emptied when the job starts, so a resumed job clears whatever a killed
+    attempt left behind. Crawls without a name get a fresh directory tagged
+    with the process ID. ``remove()`` deletes the directory when the crawl
+    ends, and ``sweep_scratch_dirs()`` catches the ones whose crawl died.
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        os.makedirs(FRONTIER_DIR, exist_ok=True)
+        if name:
+            self.path = os.path.join(FRONTIER_DIR, name)
+            shutil.rmtree(self.path, ignore_errors=True)
+            os.makedirs(self.path)
+        else:
+            self.path = tempfile.mkdtemp(prefix=f"pid{os.getpid()}-", dir=FRONTIER_DIR)
+
+    def remove(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Exists, but belongs to another user
+    return True
+
+
+def sweep_scratch_dirs(job_active: Callable[[str], bool]):
+    """
+    Delete frontier databases left behind by crawls that died.
+
+    Unnamed directories go once their process has exited, job directories
+    once ``job_active(job_id)`` is False, i.e. the job finished or its
+    worker died and it was never resumed. Loose files from before crawls had their own directory
+    are removed too.
+    """
+    if not os.path.isdir(FRONTIER_DIR):
+        return
+    removed = 0
+    for entry in os.listdir(FRONTIER_DIR):
+        path = os.path.join(FRONTIER_DIR, entry)
+        try:
+            if not os.path.isdir(path):
+                os.remove(path)
+            elif entry.startswith('pid'):
+                pid = entry[3:].split('-', 1)[0]
+                if pid.isdigit() and _process_alive(int(pid)):
+                    continue
+                shutil.rmtree(path)
+            elif not job_active(entry):
+                shutil.rmtree(path)
+            else:
+                continue
+            removed += 1
+        except OSError as e:
+            print(f"Could not remove frontier scratch {path}: {e}")
+    if removed:
+        print(f"Removed {removed} orphaned frontier scratch entries from {FRONTIER_DIR}")
+
+
+def open_scratch_db(prefix: str, directory: Optional[str] = None) -> Tuple[sqlite3.Connection, str]:
+    """
+    Create a throwaway SQLite database in ``directory`` (by default FRONTIER_DIR).
+
+    Durability is switched off: a crawl that dies is resumed from its
+    journal, not from here.
+    """
+    directory = directory or FRONTIER_DIR
+    os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix=prefix, suffix='.sqlite3', dir=directory)
+    os.close(fd)
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute('PRAGMA journal_mode=OFF')
+    conn.execute('PRAGMA synchronous=OFF')
+    return conn, path
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over 64-bit fingerprints.
+
+    Sized for ``capacity`` items at ``error_rate`` false positives. Past
+    that capacity it keeps working, with a rising false positive rate.
+    """
+
+    def __init__(self, capacity: int = FRONTIER_BLOOM_CAPACITY, error_rate: float = 0.01):
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 64)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, fingerprint: int):
+        # Double hashing: two halves of the fingerprint give all k positions
+        low, high = fingerprint & 0xFFFFFFFF, (fingerprint >> 32) & 0xFFFFFFFF
+        for i in range(self.hashes):
+            yield (low + i * high) % self.size
+
+    def add(self, fingerprint: int) -> bool:
+        """Set the fingerprint's bits. Returns True if they were all set already (maybe seen)."""
+        bits = self.bits
+        present = True
+        for position in self._positions(fingerprint):
+            index, mask = position >> 3, 1 << (position & 7)
+            if not bits[index] & mask:
+                present = False
+                bits[index] |= mask
+        return present
+
+    def __contains__(self, fingerprint: int) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(fingerprint))
+
+
+class SeenUrls:
+    """
+    Exact, memory-bounded set of URLs, stored as fingerprints.
+
+    A Bloom filter answers most lookups in memory. URLs it has never seen
+    are new for certain and their fingerprints are written to SQLite in
+    batches; only the rare "maybe seen" answer is checked against disk.
+    Memory stays at the filter's fixed size however many URLs are added.
+    """
+
+    BATCH_SIZE = 1000
+
+    def __init__(self, conn: Optional[sqlite3.Connection] = None, capacity: int = FRONTIER_BLOOM_CAPACITY,
+                 directory: Optional[str] = None):
+        self.path = None
+        if conn is None:
+            conn, self.path = open_scratch_db('seen-', directory)
+        self.conn = conn
+        self.conn.execute("CREATE TABLE IF NOT EXISTS seen (fingerprint INTEGER PRIMARY KEY)")
+        self.bloom = BloomFilter(capacity)
+        self.pending: Set[int] = set()  # Fingerprints not yet written to disk
+        self.count = 0
+
+    def _flush(self):
+        if self.pending:
+            self.conn.execute('BEGIN')
+            self.conn.executemany("INSERT OR IGNORE INTO seen (fingerprint) VALUES (?)",
+                                  ((fingerprint,) for fingerprint in self.pending))
+            self.conn.execute('COMMIT')
+            self.pending.clear()
+
+    def _on_disk(self, fingerprint: int) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM seen WHERE fingerprint = ?", (fingerprint,)
+        ).fetchone() is not None
+
+    def _seen(self, fingerprint: int) -> bool:
+        if fingerprint not in self.bloom:
+            return False
+        return fingerprint in self.pending or self._on_disk(fingerprint)
+
+    def add(self, url: str) -> bool:
+        """Record a URL. Returns True if it had not been seen before."""
+        fingerprint = url_fingerprint(url)
+        if self.bloom.add(fingerprint) and (fingerprint in self.pending or self._on_disk(fingerprint)):
+            return False
+        self.pending.add(fingerprint)
+        self.count += 1
+        if len(self.pending) >= self.BATCH_SIZE:
+            self._flush()
+        return True
+
+    def update(self, urls: Iterable[str]):
+        for url in urls:
+            self.add(url)
+
+    def __contains__(self, url: str) -> bool:
+        return self._seen(url_fingerprint(url))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self):
+        """Delete the backing database if this set created it."""
+        if self.path:
+            self.conn.close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self.path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class UrlFrontier:
+    """
+    Disk-backed priority queue of URLs still to visit that ignores URLs it has seen.
+
+    Lower priorities are popped first, first in first out within a
+    priority. Up to ``memory_limit`` queued URLs are kept in memory; the
+    rest spill to SQLite and are read back in batches, so a frontier of
+    millions of URLs costs about as much RAM as an empty one. A URL counts
+    as seen from the moment it is added (see ``SeenUrls``), so one that is
+    listed in several places is only visited once. ``requeue()`` puts a URL
+    back regardless, e.g. to retry it later at a lower priority.
+    """
+
+    def __init__(self, seen: Optional[Iterable[str]] = None, memory_limit: int = FRONTIER_MEMORY_LIMIT,
+                 capacity: int = FRONTIER_BLOOM_CAPACITY, directory: Optional[str] = None):
+        self.conn, self.path = open_scratch_db('frontier-', directory)
+        self.conn.execute(
+            "CREATE TABLE queue (id INTEGER PRIMARY KEY AUTOINCREMENT, priority INTEGER NOT NULL, url TEXT NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX queue_order ON queue (priority, id)")
+        self.seen = SeenUrls(self.conn, capacity)
+        self.seen.update(seen or ())
+        self.memory_limit = memory_limit
+        self.memory: Dict[int, Deque[str]] = {}  # priority -> oldest queued URLs
+        self.spilled: Dict[int, int] = {}  # priority -> URLs waiting on disk (or in spill_buffer)
+        self.spill_buffer: List[Tuple[int, str]] = []  # Spilled URLs not yet written
+        self.size = 0
+
+    def _push(self, url: str, priority: int):
+        queue = self.memory.setdefault(priority, deque())
+        # Once a priority has spilled, newer URLs go to disk behind the spilled ones
+        if self.spilled.get(priority) or len(queue) >= self.memory_limit:
+            self.spill_buffer.append((priority, url))
+            self.spilled[priority] = self.spilled.get(priority, 0) + 1
+            if len(self.spill_buffer) >= SeenUrls.BATCH_SIZE:
+                self._flush_spill()
+        else:
+            queue.append(url)
+        self.size += 1
+
+    def _flush_spill(self):
+        if self.spill_buffer:
+            self.conn.execute('BEGIN')
+            self.conn.executemany("INSERT INTO queue (priority, url) VALUES (?, ?)", self.spill_buffer)
+            self.conn.execute('COMMIT')
+            self.spill_buffer.clear()
+
+    def add(self, url: str, priority: int = 0) -> bool:
+        """Queue a URL unless it was seen before. Returns whether it was queued."""
+        if not self.seen.add(url):
+            return False
+        self._push(url, priority)
+        return True
+
+    def requeue(self, url: str, priority: int):
+        """Queue a URL again even though it has been seen."""
+        self._push(url, priority)
+
+    def _load(self, priority: int):
+        self._flush_spill()
+        rows = self.conn.execute(
+            "SELECT id, url FROM queue WHERE priority = ? ORDER BY id LIMIT ?", (priority, self.memory_limit)
+        ).fetchall()
+        if rows:
+            self.conn.execute("DELETE FROM queue WHERE priority = ? AND id <= ?", (priority, rows[-1][0]))
+            self.memory[priority].extend(url for _, url in rows)
+            self.spilled[priority] -= len(rows)
+
+    def pop(self) -> Optional[Tuple[str, int]]:
+        """Remove and return the next ``(url, priority)``, or None when the frontier is empty."""
+        for priority in sorted(self.memory):
+            queue = self.memory[priority]
+            if not queue and self.spilled.get(priority):
+                self._load(priority)
+            if queue:
+                self.size -= 1
+                return queue.popleft(), priority
+        return None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def close(self):
+        """Delete the backing database."""
+        self.conn.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
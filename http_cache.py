@@ -0,0 +1,176 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from settings import HTTP_CACHE_PATH, HTTP_CACHE_TTL, HTTP_CACHE_MAX_BYTES
+
+# Response headers kept with a cached body
+STORED_HEADERS = ('content-type', 'etag', 'last-modified')
+
+
+def build_response(url: str, status_code: int, headers: Dict, content: bytes) -> requests.Response:
+    """Build a requests.Response from stored parts, so callers can't tell it apart from a live one."""
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = content
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+class CacheEntry:
+    """A cached response body with its validators."""
+
+    def __init__(self, url: str, headers: Dict, content: bytes, stored_at: float):
+        self.url = url
+        self.headers = headers
+        self.content = content
+        self.stored_at = stored_at
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get('etag')
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get('last-modified')
+
+    def is_fresh(self, ttl: int) -> bool:
+        return time.time() - self.stored_at < ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Request headers that turn a GET into a revalidation of this entry."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def to_response(self) -> requests.Response:
+        response = build_response(self.url, 200, self.headers, self.content)
+        response.from_cache = True
+        return response
+
+
+class HttpCache:
+    """
+    Persistent, size-bounded HTTP cache keyed by URL.
+
+    Bodies are stored zlib-compressed in SQLite together with their ETag and
+    Last-Modified validators. Entries younger than ``ttl`` are served without
+    touching the network; older ones should be revalidated with a conditional
+    GET. When the compressed total exceeds ``max_bytes`` the least recently
+    used entries are evicted.
+    """
+
+    def __init__(self, path: str = HTTP_CACHE_PATH, ttl: int = HTTP_CACHE_TTL,
+                 max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    url TEXT PRIMARY KEY,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    stored_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute(
+                "INSERT OR IGNORE INTO stats (name, value) SELECT 'total_size', COALESCE(SUM(size), 0) FROM entries"
+            )
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Return the cached entry for a URL, fresh or stale, or None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT headers, body, stored_at FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE url = ?", (time.time(), url))
+
+        headers, body, stored_at = row
+        return CacheEntry(url, json.loads(headers), zlib.decompress(body), stored_at)
+
+    def store(self, url: str, response: requests.Response):
+        """Store a successful response body with its validators."""
+        headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        body = zlib.compress(response.content, 6)
+        now = time.time()
+
+        with self.lock, self._connect() as conn:
+            old = conn.execute("SELECT size FROM entries WHERE url = ?", (url,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (url, headers, body, size, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, json.dumps(headers), body, len(body), now, now)
+            )
+            conn.execute(
+                "UPDATE stats SET value = value + ? WHERE name = 'total_size'",
+                (len(body) - (old[0] if old else 0),)
+            )
+            self._evict(conn)
+
+    def refresh(self, url: str, response: requests.Response):
+        """Mark an entry fresh again after a 304 Not Modified."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT headers FROM entries WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return
+            headers = json.loads(row[0])
+            for name in ('etag', 'last-modified'):
+                if name in response.headers:
+                    headers[name] = response.headers[name]
+            now = time.time()
+            conn.execute(
+                "UPDATE entries SET headers = ?, stored_at = ?, accessed_at = ? WHERE url = ?",
+                (json.dumps(headers), now, now, url)
+            )
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT value FROM stats WHERE name = 'total_size'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = 0
+        for url, size in conn.execute("SELECT url, size FROM entries ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+            total -= size
+            evicted += 1
+
+        conn.execute("UPDATE stats SET value = ? WHERE name = 'total_size'", (total,))
+        print(f"HTTP cache: evicted {evicted} entries, {total} bytes remain")
+
+    def clear(self):
+        """Remove every cached entry."""
+        with self.lock, self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+            conn.execute("UPDATE stats SET value = 0 WHERE name = 'total_size'")
@@ -0,0 +1,378 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from settings import JOBS_DB_PATH, JOB_WORKERS, JOB_QUEUE_LIMIT, JOB_STALE_AFTER
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+class QueueFullError(Exception):
+    """Raised when the worker pool already holds the maximum number of jobs."""
+
+
+class JobStore:
+    """
+    SQLite-backed job store.
+
+    The database file is shared by every gunicorn worker on the host, so a
+    job submitted through one worker can be polled through any other.
+    """
+
+    # Columns added after the first release, as (name, definition)
+    ADDED_COLUMNS = [
+        ('progress', 'TEXT'),
+        ('query_key', 'TEXT'),
+    ]
+
+    def __init__(self, db_path: str = JOBS_DB_PATH):
+        self.db_path = db_path
+        directory = os.path.dirname(self.db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    progress TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
+            # Add columns introduced after the table was first created
+            existing = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, definition in self.ADDED_COLUMNS:
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_query_key ON jobs (kind, query_key, status)")
+
+    def create(self, kind: str, params: Dict, query_key: Optional[str] = None) -> str:
+        """Insert a new queued job and return its ID."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, params, status, query_key, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(params), QUEUED, query_key, now, now)
+            )
+        return job_id
+
+    def find_active(self, kind: str, query_key: str) -> Optional[str]:
+        """Return the ID of a live queued/running job for ``query_key``, or None."""
+        with self._connect() as conn:
+            return self._find_active(conn, kind, query_key)
+
+    def create_or_attach(self, kind: str, params: Dict, query_key: str) -> Tuple[str, bool]:
+        """
+        Insert a queued job unless a live job with the same key already exists.
+
+        The lookup and insert run in one write transaction, so concurrent
+        callers in different processes end up sharing a single job.
+
+        Returns:
+            tuple: (job_id, created)
+        """
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            job_id = self._find_active(conn, kind, query_key)
+            if job_id:
+                return job_id, False
+
+            job_id = uuid.uuid4().hex
+            now = time.time()
+            conn.execute(
+                "INSERT INTO jobs (id, kind, params, status, query_key, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(params), QUEUED, query_key, now, now)
+            )
+        return job_id, True
+
+    @staticmethod
+    def _find_active(conn: sqlite3.Connection, kind: str, query_key: str) -> Optional[str]:
+        # Jobs that stopped updating belong to a worker that died; don't attach to them
+        row = conn.execute(
+            f"SELECT id FROM jobs WHERE kind = ? AND query_key = ? AND status IN ({', '.join('?' * len(ACTIVE_STATES))}) "
+            "AND updated_at >= ? ORDER BY created_at LIMIT 1",
+            (kind, query_key, *ACTIVE_STATES, time.time() - JOB_STALE_AFTER)
+        ).fetchone()
+        return row['id'] if row else None
+
+    def is_live(self, job_id: str) -> bool:
+        """Whether the job is queued or running and still updating (see ``requeue()``)."""
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT 1 FROM jobs WHERE id = ? AND status IN ({', '.join('?' * len(ACTIVE_STATES))}) "
+                "AND updated_at >= ?",
+                (job_id, *ACTIVE_STATES, time.time() - JOB_STALE_AFTER)
+            ).fetchone()
+        return row is not None
+
+    def is_resumable(self, job_id: str, max_age: float) -> bool:
+        """Whether the job is active, or failed within ``max_age`` seconds and may still be resumed."""
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT 1 FROM jobs WHERE id = ? AND (status IN ({', '.join('?' * len(ACTIVE_STATES))}) "
+                "OR (status = ? AND finished_at >= ?))",
+                (job_id, *ACTIVE_STATES, FAILED, time.time() - max_age)
+            ).fetchone()
+        return row is not None
+
+    def requeue(self, job_id: str) -> bool:
+        """
+        Put a failed or interrupted job back in the queue under the same ID.
+
+        Queued and running jobs only count as interrupted once they have
+        stopped updating for ``JOB_STALE_AFTER`` seconds. Running jobs update
+        with their progress and queued ones are heartbeated by their
+        ``JobQueue``, so that only happens when the process holding the job
+        died. Returns False if the job is missing, completed or still live.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, error = NULL, finished_at = NULL, updated_at = ? "
+                f"WHERE id = ? AND (status = ? OR (status IN ({', '.join('?' * len(ACTIVE_STATES))}) "
+                "AND updated_at < ?))",
+                (QUEUED, now, job_id, FAILED, *ACTIVE_STATES, now - JOB_STALE_AFTER)
+            )
+            return cursor.rowcount == 1
+
+    def mark_running(self, job_id: str):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, updated_at = ? WHERE id = ?",
+                (RUNNING, now, now, job_id)
+            )
+
+    def touch(self, job_ids):
+        """Mark queued jobs as alive, so ones waiting for a worker never look abandoned."""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE jobs SET updated_at = ? WHERE status = ? AND id IN ({', '.join('?' * len(job_ids))})",
+                (time.time(), QUEUED, *job_ids)
+            )
+
+    def update_progress(self, job_id: str, progress: Dict):
+        """Store the latest progress snapshot reported by a running job."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET progress = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(progress), time.time(), job_id)
+            )
+
+    def mark_completed(self, job_id: str, result: Dict):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, finished_at = ?, updated_at = ? WHERE id = ?",
+                (COMPLETED, json.dumps(result), now, now, job_id)
+            )
+
+    def mark_failed(self, job_id: str, error: str):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ?, updated_at = ? WHERE id = ?",
+                (FAILED, error, now, now, job_id)
+            )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Return the job as a plain dict, or None if it does not exist."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._decode(row)
+
+    def find_result(self, kind: str, query_key: str, max_age: float) -> Optional[Dict]:
+        """Return the newest job for ``query_key`` that completed within ``max_age`` seconds."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE kind = ? AND query_key = ? AND status = ? AND finished_at >= ? "
+                "ORDER BY finished_at DESC LIMIT 1",
+                (kind, query_key, COMPLETED, time.time() - max_age)
+            ).fetchone()
+        return self._decode(row)
+
+    @staticmethod
+    def _decode(row: Optional[sqlite3.Row]) -> Optional[Dict]:
+        if row is None:
+            return None
+
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        job['progress'] = json.loads(job['progress']) if job['progress'] else None
+        return job
+
+
+class JobQueue:
+    """
+    Bounded worker pool that runs long scrapes outside the request thread.
+
+    Handlers are registered per job kind and are called as
+    ``handler(job_id, **params)``. A handler returns a JSON-serialisable
+    result dict, or raises to mark the job as failed.
+
+    Jobs waiting for a worker are heartbeated every ``heartbeat_interval``
+    seconds. Only jobs whose process has died then stop updating, so a job
+    queued behind long crawls is never taken for an interrupted one (see
+    ``JobStore.requeue()``).
+    """
+
+    def __init__(self, store: JobStore, max_workers: int = JOB_WORKERS, max_jobs: int = JOB_QUEUE_LIMIT,
+                 heartbeat_interval: Optional[float] = None):
+        self.store = store
+        self.handlers: Dict[str, Callable] = {}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='gemleads-job')
+        self.slots = threading.BoundedSemaphore(max_jobs)
+        self.waiting: Set[str] = set()  # Queued in this process, not yet started
+        self.waiting_lock = threading.Lock()
+        self.heartbeat_interval = heartbeat_interval or max(JOB_STALE_AFTER / 4, 1)
+        self.heartbeat = threading.Thread(target=self._heartbeat, name='gemleads-job-heartbeat', daemon=True)
+        self.heartbeat.start()
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(self.heartbeat_interval)
+            with self.waiting_lock:
+                waiting = list(self.waiting)
+            try:
+                self.store.touch(waiting)
+            except sqlite3.Error as e:
+                print(f"Job heartbeat failed: {e}")
+
+    def _enqueue(self, job_id: str, kind: str, params: Dict):
+        with self.waiting_lock:
+            self.waiting.add(job_id)
+        self.executor.submit(self._run, job_id, kind, params)
+
+    def register(self, kind: str, handler: Callable):
+        """Register the handler that runs jobs of the given kind."""
+        self.handlers[kind] = handler
+
+    def submit(self, kind: str, params: Dict, query_key: Optional[str] = None) -> str:
+        """
+        Queue a job and return its ID immediately.
+
+        ``query_key`` identifies equivalent requests. While a job with the
+        same key is queued or running, anywhere on the host, its ID is
+        returned instead of starting a duplicate, and the result can be
+        looked up later with ``JobStore.find_result()``.
+
+        Raises:
+            KeyError: If no handler is registered for ``kind``
+            QueueFullError: If this process already holds ``max_jobs`` jobs
+        """
+        if kind not in self.handlers:
+            raise KeyError(f"No handler registered for job kind: {kind}")
+
+        # Attaching to a job in flight doesn't need a worker slot
+        if query_key:
+            job_id = self.store.find_active(kind, query_key)
+            if job_id:
+                print(f"Attached to {kind} job {job_id}")
+                return job_id
+
+        if not self.slots.acquire(blocking=False):
+            raise QueueFullError("Too many jobs in progress. Please try again shortly.")
+
+        try:
+            if query_key:
+                job_id, created = self.store.create_or_attach(kind, params, query_key)
+            else:
+                job_id, created = self.store.create(kind, params), True
+            if created:
+                self._enqueue(job_id, kind, params)
+        except Exception:
+            self.slots.release()
+            raise
+
+        if not created:
+            # Another process queued the same job between our lookup and insert
+            self.slots.release()
+            print(f"Attached to {kind} job {job_id}")
+            return job_id
+
+        print(f"Queued {kind} job {job_id}")
+        return job_id
+
+    def resume(self, job_id: str) -> bool:
+        """
+        Run a failed or interrupted job again under its original ID.
+
+        Handlers that keep a checkpoint journal per job ID pick up where the
+        previous attempt stopped. Returns False if the job cannot be resumed
+        (see ``JobStore.requeue()``).
+
+        Raises:
+            QueueFullError: If this process already holds ``max_jobs`` jobs
+        """
+        job = self.store.get(job_id)
+        if not job or job['kind'] not in self.handlers:
+            return False
+
+        if not self.slots.acquire(blocking=False):
+            raise QueueFullError("Too many jobs in progress. Please try again shortly.")
+
+        try:
+            # The conditional update makes sure only one worker resumes the job
+            if not self.store.requeue(job_id):
+                self.slots.release()
+                return False
+            self._enqueue(job_id, job['kind'], job['params'])
+        except Exception:
+            self.slots.release()
+            raise
+
+        print(f"Resumed {job['kind']} job {job_id}")
+        return True
+
+    def _run(self, job_id: str, kind: str, params: Dict):
+        try:
+            with self.waiting_lock:
+                self.waiting.discard(job_id)
+            self.store.mark_running(job_id)
+            print(f"Running {kind} job {job_id}")
+            result = self.handlers[kind](job_id, **params)
+            self.store.mark_completed(job_id, result or {})
+            print(f"Completed {kind} job {job_id}")
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            traceback.print_exc()
+            self.store.mark_failed(job_id, str(e))
+        finally:
+            self.slots.release()
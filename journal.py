@@ -0,0 +1,142 @@
+import json
+import os
+from typing import Callable, Dict, Iterator, Optional, Set
+
+from settings import JOURNAL_DIR
+
+
+class ScrapeJournal:
+    """
+    Append-only checkpoint journal of a scrape, one JSON object per line.
+
+    Every finished business URL is logged together with the record it
+    produced (or none, if the business was skipped), every finished
+    results page with the URL to continue from, and every sitemap whose
+    businesses have all been handled. Opening an existing journal
+    replays it, so a restarted job can skip finished work and carry on from
+    the last page. Lines are flushed as they are written and synced to disk
+    after every page and sitemap; a line torn by a crash is ignored on replay.
+    Finished URLs and records are only counted in memory and are read back
+    from the file on demand, so a journal of millions of businesses stays
+    cheap to hold.
+    """
+
+    def __init__(self, path: str, name: Optional[str] = None):
+        self.path = path
+        self.name = name or os.path.splitext(os.path.basename(path))[0]
+        self.done_count = 0  # Finished business URLs
+        self.record_count = 0  # Records among them
+        self.pages_done = 0
+        self.next_url: Optional[str] = None
+        self.done_sitemaps: Set[str] = set()
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self._replay()
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    @classmethod
+    def for_job(cls, job_id: str, directory: str = JOURNAL_DIR) -> 'ScrapeJournal':
+        return cls(os.path.join(directory, f"{job_id}.jsonl"), name=job_id)
+
+    def _entries(self) -> Iterator[Dict]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # Partially written when the process died
+
+    def _replay(self):
+        for entry in self._entries():
+            if 'page' in entry:
+                self.pages_done = entry['page']
+                self.next_url = entry.get('next')
+            elif 'sitemap' in entry:
+                self.done_sitemaps.add(entry['sitemap'])
+            elif 'url' in entry:
+                self.done_count += 1
+                if entry.get('record'):
+                    self.record_count += 1
+        if self.resumed:
+            print(f"Resuming from journal {self.path}: {self.pages_done} pages, "
+                  f"{self.done_count} businesses, {self.record_count} records")
+
+    @property
+    def resumed(self) -> bool:
+        """Whether earlier progress was found on disk."""
+        return bool(self.done_count or self.pages_done or self.done_sitemaps)
+
+    def iter_done_urls(self) -> Iterator[str]:
+        """Every finished business URL, read back from disk."""
+        self.file.flush()
+        for entry in self._entries():
+            if 'url' in entry:
+                yield entry['url']
+
+    def iter_records(self) -> Iterator[Dict]:
+        """Every emitted record in order, read back from disk."""
+        self.file.flush()
+        for entry in self._entries():
+            if entry.get('record'):
+                yield entry['record']
+
+    def _append(self, entry: Dict):
+        self.file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self.file.flush()
+
+    def business_done(self, url: str, record: Optional[Dict] = None):
+        """Log a finished business page and the record it produced, if any."""
+        self.done_count += 1
+        if record:
+            self.record_count += 1
+        self._append({'url': url, 'record': record})
+
+    def page_done(self, page: int, next_url: Optional[str]):
+        """Log a finished results page and where the scrape continues."""
+        self.pages_done = page
+        self.next_url = next_url
+        self._append({'page': page, 'next': next_url})
+        os.fsync(self.file.fileno())
+
+    def sitemap_done(self, url: str):
+        """Log a sitemap whose links have all been crawled."""
+        self.done_sitemaps.add(url)
+        self._append({'sitemap': url})
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def discard(self):
+        """Close and delete the journal once the scrape has finished."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def sweep_journals(keep: Callable[[str], bool], directory: str = JOURNAL_DIR):
+    """
+    Delete the journals of jobs that can no longer be resumed.
+
+    A journal is kept while ``keep(job_id)`` is True, i.e. its job is still
+    running or failed recently enough to be resumed; journals of completed,
+    deleted or long-failed jobs are removed.
+    """
+    if not os.path.isdir(directory):
+        return
+    removed = 0
+    for entry in os.listdir(directory):
+        job_id, extension = os.path.splitext(entry)
+        if extension != '.jsonl' or keep(job_id):
+            continue
+        try:
+            os.remove(os.path.join(directory, entry))
+            removed += 1
+        except OSError as e:
+            print(f"Could not remove journal {entry}: {e}")
+    if removed:
+        print(f"Removed {removed} journals of finished jobs from {directory}")
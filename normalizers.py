@@ -0,0 +1,40 @@
+import re
+
+from records import BusinessRecord
+
+# Digits glued onto an "info" mailbox, e.g. "0123info@" scraped from "Tel: 0123 info@..."
+NUMBERED_INFO = re.compile(r'^\d+info')
+
+
+def clean_email(email: str) -> str:
+    """Clean email by removing numbers before 'info' and fixing domain duplications."""
+    try:
+        if not email or '@' not in email:
+            return email
+            
+        local, domain = email.split('@', 1)
+        
+        # Remove numbers before 'info'
+        if 'info' in local:
+            local = NUMBERED_INFO.sub('info', local)
+        
+        # Handle common domain duplications
+        if '.ie' in domain:
+            base_domain = domain.split('.ie')[0]
+            domain = f"{base_domain}.ie"
+        elif '.com' in domain:
+            base_domain = domain.split('.com')[0]
+            domain = f"{base_domain}.com"
+            
+        return f"{local}@{domain}"
+        
+    except Exception as e:
+        print(f"Error cleaning email: {e}")
+        return email
+
+
+def normalize_record(record: BusinessRecord) -> BusinessRecord:
+    """Final clean-up applied to every record before it is written."""
+    if record.email:
+        record = record._replace(email=clean_email(record.email))
+    return record
@@ -0,0 +1,164 @@
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+from settings import (
+    RATE_FLOOR, RATE_DECREASE_FACTOR, RATE_INCREASE_STEP,
+    RATE_SUCCESS_THRESHOLD, RATE_MAX_RETRY_AFTER
+)
+
+# Statuses that mean "slow down"
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds from now."""
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class HostRate:
+    """Adaptive rate state for one host."""
+
+    def __init__(self, ceiling: float):
+        self.ceiling = ceiling
+        self.rate = ceiling
+        self.blocked_until = 0.0
+        self.success_streak = 0
+        self.successes = 0
+        self.throttles = 0
+        self.errors = 0
+        self.last_retry_after = None
+
+    def to_dict(self) -> Dict:
+        return {
+            'rate': round(self.rate, 4),
+            'ceiling': round(self.ceiling, 4),
+            'blocked_for': round(max(self.blocked_until - time.monotonic(), 0.0), 2),
+            'success_streak': self.success_streak,
+            'successes': self.successes,
+            'throttles': self.throttles,
+            'errors': self.errors,
+            'last_retry_after': self.last_retry_after
+        }
+
+
+class AdaptiveRateController:
+    """
+    Per-host AIMD request-rate controller.
+
+    A throttling response (429/503) or a server/transport error cuts the
+    host's allowed rate by ``decrease_factor``. Every ``success_threshold``
+    consecutive successes add ``increase_step`` back, up to the host's
+    ceiling. A Retry-After header additionally blocks the host until the
+    requested time. The state lives for the whole process, so what one
+    scrape learns carries over to the next.
+
+    ``on_rate_change(host, rate)`` is called whenever a host's rate changes,
+    so the fetch engine can retune its token bucket.
+    """
+
+    def __init__(self, ceiling: float, floor: float = RATE_FLOOR,
+                 decrease_factor: float = RATE_DECREASE_FACTOR,
+                 increase_step: float = RATE_INCREASE_STEP,
+                 success_threshold: int = RATE_SUCCESS_THRESHOLD,
+                 max_retry_after: float = RATE_MAX_RETRY_AFTER,
+                 on_rate_change: Optional[Callable[[str, float], None]] = None):
+        self.ceiling = ceiling
+        self.floor = min(floor, ceiling)
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.success_threshold = success_threshold
+        self.max_retry_after = max_retry_after
+        self.on_rate_change = on_rate_change
+        self.hosts: Dict[str, HostRate] = {}
+        self.lock = threading.Lock()
+
+    def _host(self, host: str) -> HostRate:
+        if host not in self.hosts:
+            self.hosts[host] = HostRate(self.ceiling)
+        return self.hosts[host]
+
+    def _set_rate(self, host: str, state: HostRate, rate: float):
+        rate = min(max(rate, self.floor), state.ceiling)
+        if rate == state.rate:
+            return
+        state.rate = rate
+        if self.on_rate_change:
+            self.on_rate_change(host, rate)
+
+    def rate(self, host: str) -> float:
+        """Currently allowed requests per second for a host."""
+        with self.lock:
+            return self._host(host).rate
+
+    def set_ceiling(self, host: str, ceiling: float):
+        """Lower (or raise) the maximum rate for one host, e.g. from robots.txt."""
+        with self.lock:
+            state = self._host(host)
+            state.ceiling = ceiling
+            self._set_rate(host, state, min(state.rate, ceiling))
+
+    def blocked_for(self, host: str) -> float:
+        """Seconds until the host may be contacted again after a Retry-After."""
+        with self.lock:
+            return max(self._host(host).blocked_until - time.monotonic(), 0.0)
+
+    def record_response(self, host: str, status_code: int, retry_after: Optional[str] = None):
+        """Feed a response status (and its Retry-After header) into the controller."""
+        if status_code in THROTTLE_STATUSES:
+            self.record_throttle(host, parse_retry_after(retry_after))
+        elif status_code >= 500:
+            self.record_error(host)
+        elif status_code < 400:
+            self.record_success(host)
+
+    def record_success(self, host: str):
+        with self.lock:
+            state = self._host(host)
+            state.successes += 1
+            state.success_streak += 1
+            if state.success_streak >= self.success_threshold:
+                state.success_streak = 0
+                self._set_rate(host, state, state.rate + self.increase_step)
+
+    def record_throttle(self, host: str, retry_after: Optional[float] = None):
+        with self.lock:
+            state = self._host(host)
+            state.throttles += 1
+            state.success_streak = 0
+            self._set_rate(host, state, state.rate * self.decrease_factor)
+
+            if retry_after is not None:
+                state.last_retry_after = retry_after
+                retry_after = min(retry_after, self.max_retry_after)
+                state.blocked_until = max(state.blocked_until, time.monotonic() + retry_after)
+                print(f"{host} asked us to retry after {retry_after:.0f}s; rate now {state.rate:.3f}/s")
+            else:
+                print(f"{host} is throttling; rate now {state.rate:.3f}/s")
+
+    def record_error(self, host: str):
+        with self.lock:
+            state = self._host(host)
+            state.errors += 1
+            state.success_streak = 0
+            self._set_rate(host, state, state.rate * self.decrease_factor)
+
+    def state(self) -> Dict[str, Dict]:
+        """Snapshot of every host's state, for metrics."""
+        with self.lock:
+            return {host: state.to_dict() for host, state in self.hosts.items()}
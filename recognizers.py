@@ -0,0 +1,175 @@
+import re
+from typing import List, Optional, Tuple
+
+# Texts longer than this are scanned in large-text mode
+LARGE_TEXT_THRESHOLD = 20000
+
+# Email separators, including the usual obfuscations: "[at]", "(at)", " at ",
+# "[dot]", "(dot)", " dot " and " . ". A bare " at " is only accepted when the
+# domain is obfuscated too (see _email_from_match), so prose like "visit us at
+# www.acme.ie" is not read as an address.
+_AT = r'(?:\s*@\s*|\s*[\[(]at[\])]\s*|\s+at\s+)'
+_DOT = r'(?:\.|\s+\.\s+|\s*[\[(]dot[\])]\s*|\s+dot\s+)'
+
+# The lookbehind stops the engine from retrying a match at every character
+# inside a long word, which is what made the old per-pattern scans slow. The
+# lookahead keeps "John at john@site.ie" from reading as john@john.
+_EMAIL = rf'(?<![\w.-])(?P<local>[\w.-]+)(?P<at>{_AT})(?P<domain>[\w-]+(?:{_DOT}[\w-]+)+)(?![\w.-]*@)'
+
+# Irish numbers: international (+353 / 00353), freephone/callsave (1800, 1850,
+# 1890), national landline and mobile, plus the generic pattern used so far.
+_PHONE = (
+    r'(?<![\d+])(?P<phone>'
+    r'(?:\+|00)353[\s-]?(?:\(0\))?[\s-]?\d{1,2}[\s-]?\d{3}[\s-]?\d{3,4}'
+    r'|1[58][05]0[\s-]?\d{3}[\s-]?\d{3}'
+    r'|\(?0\d{1,2}\)?[\s-]?\d{3}[\s-]?\d{3,4}'
+    r'|\(?\d{2,3}\)?\s*\d{3,4}[\s-]?\d{4}'
+    r')(?!\d)'
+)
+
+EMAIL_PATTERN = re.compile(_EMAIL, re.IGNORECASE)
+PHONE_PATTERN = re.compile(_PHONE)
+CONTACT_PATTERN = re.compile(rf'{_EMAIL}|{_PHONE}', re.IGNORECASE)
+
+# Cheap markers used to find the neighbourhood of an email in large texts
+EMAIL_ANCHOR = re.compile(r'@|[\[(]at[\])]|\sat\s', re.IGNORECASE)
+DOT_SEPARATOR = re.compile(r'\s*[\[(]dot[\])]\s*|\s+dot\s+|\s+\.\s+', re.IGNORECASE)
+
+VALID_EMAIL = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Longest email address allowed by RFC 5321, used to size scan windows
+_MAX_LOCAL = 64
+_MAX_DOMAIN = 255
+
+
+def is_valid_email(email: str) -> bool:
+    """Basic email syntax check."""
+    return bool(email) and VALID_EMAIL.match(email) is not None
+
+
+def _normalise_email(local: str, domain: str) -> str:
+    domain = DOT_SEPARATOR.sub('.', domain)
+    return f"{local}@{domain}".replace(' ', '').lower()
+
+
+def _email_from_match(match) -> Optional[str]:
+    """The normalised email of an EMAIL_PATTERN match, or None if it is not one."""
+    domain = match.group('domain')
+    separator = match.group('at')
+    if '@' not in separator and '[' not in separator and '(' not in separator:
+        # "name at domain" only counts when the dots are spelled out as well
+        if not DOT_SEPARATOR.search(domain):
+            return None
+    email = _normalise_email(match.group('local'), domain)
+    return email if is_valid_email(email) else None
+
+
+def _unique(values: List[str]) -> List[str]:
+    return list(dict.fromkeys(values))
+
+
+class ContactRecognizer:
+    """
+    Finds email addresses and phone numbers in free text.
+
+    All patterns are compiled once at import time. Short texts are read with a
+    single combined email/phone scan; large texts (whole pages) only run the
+    email pattern in small windows around '@'/'at' markers, since emails are
+    rare compared to the amount of surrounding text.
+    """
+
+    def __init__(self, large_text_threshold: int = LARGE_TEXT_THRESHOLD):
+        self.large_text_threshold = large_text_threshold
+
+    def scan(self, text: str, large: Optional[bool] = None) -> Tuple[List[str], List[str]]:
+        """
+        Find all emails and phone numbers in a text.
+
+        Args:
+            text (str): Text to scan
+            large (bool, optional): Force large-text mode on or off. By default
+                it is used for texts longer than ``large_text_threshold``.
+
+        Returns:
+            Tuple[List[str], List[str]]: Unique emails (lower-cased,
+            de-obfuscated and syntactically valid) and phone numbers,
+            in order of appearance
+        """
+        if not text:
+            return [], []
+
+        if large is None:
+            large = len(text) > self.large_text_threshold
+        if large:
+            return self._scan_emails_windowed(text), self.find_phones(text)
+
+        emails, phones = [], []
+        for match in CONTACT_PATTERN.finditer(text):
+            if match.group('phone'):
+                phones.append(match.group('phone'))
+                continue
+            email = _email_from_match(match)
+            if email:
+                emails.append(email)
+
+        return _unique(emails), _unique(phones)
+
+    def find_emails(self, text: str, large: Optional[bool] = None) -> List[str]:
+        """Find all emails in a text. See ``scan``."""
+        if not text:
+            return []
+
+        if large is None:
+            large = len(text) > self.large_text_threshold
+        if large:
+            return self._scan_emails_windowed(text)
+
+        emails = []
+        for match in EMAIL_PATTERN.finditer(text):
+            email = _email_from_match(match)
+            if email:
+                emails.append(email)
+        return _unique(emails)
+
+    def find_phones(self, text: str) -> List[str]:
+        """Find all phone numbers in a text, in order of appearance."""
+        if not text:
+            return []
+        return _unique(PHONE_PATTERN.findall(text))
+
+    def _scan_emails_windowed(self, text: str) -> List[str]:
+        emails = []
+        scanned_to = 0
+
+        for anchor in EMAIL_ANCHOR.finditer(text):
+            if anchor.start() < scanned_to:
+                continue  # Already covered by the previous window
+
+            # The lookbehind in EMAIL_PATTERN still sees text before ``start``,
+            # so a window opening mid-word never yields a truncated local part
+            start = max(anchor.start() - _MAX_LOCAL - 1, scanned_to)
+            end = min(anchor.end() + _MAX_DOMAIN, len(text))
+
+            for match in EMAIL_PATTERN.finditer(text, start, end):
+                if match.end() <= scanned_to:
+                    continue
+                email = _email_from_match(match)
+                if email:
+                    emails.append(email)
+                scanned_to = max(scanned_to, match.end())
+
+        return _unique(emails)
+
+
+# Shared default instance
+recognizer = ContactRecognizer()
+
+
+def find_emails(text: str, large: Optional[bool] = None) -> List[str]:
+    """Find all emails in a text with the shared recognizer."""
+    return recognizer.find_emails(text, large)
+
+
+def find_phones(text: str) -> List[str]:
+    """Find all phone numbers in a text with the shared recognizer."""
+    return recognizer.find_phones(text)
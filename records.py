@@ -0,0 +1,120 @@
+import csv
+import os
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
+
+class BusinessRecord(NamedTuple):
+    """One exported business. Field order is the CSV column order."""
+    name: Optional[str] = None
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    website: Optional[str] = None
+    location: Optional[str] = None
+    county: Optional[str] = None
+    categories: Optional[str] = None
+    source_url: Optional[str] = None  # Business page the record came from; sitemap exports only
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'BusinessRecord':
+        """Build a record from scraped business data, ignoring fields that are not exported."""
+        return cls(*(data.get(field) or None for field in cls._fields))
+
+
+FIELDS = list(BusinessRecord._fields)
+
+# Columns of a search export, and the fields a projection can pick from
+COLUMNS = [field for field in FIELDS if field != 'source_url']
+
+# Sitemap exports also say which business page each row was scraped from
+SITEMAP_COLUMNS = COLUMNS + ['source_url']
+
+
+def select_columns(fields: Union[str, Iterable[str], None]) -> List[str]:
+    """
+    Resolve a field projection such as ``"name, phone, location"`` to export columns.
+
+    Columns keep their usual order. An empty or missing projection means
+    every column.
+
+    Raises:
+        ValueError: If a field is not an export column, or ``fields`` is
+            neither a string nor a list of strings
+    """
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    elif fields and not (isinstance(fields, (list, tuple)) and all(isinstance(field, str) for field in fields)):
+        raise ValueError("fields must be a comma-separated string or a list of field names")
+    requested = {field.strip().lower() for field in fields or () if field.strip()}
+    unknown = requested - set(COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. Choose from: {', '.join(COLUMNS)}")
+    return [column for column in COLUMNS if column in requested] or list(COLUMNS)
+
+
+class CsvRecordSink:
+    """
+    Streams records to a CSV file as they are produced.
+
+    Rows are buffered and flushed to disk every ``batch_size`` records, so
+    memory use does not grow with the size of the export. Only ``columns``
+    (all of them by default) are written. The file is
+    written under a ``.partial.csv`` name; ``finish()`` renames it to its
+    final name, while a crashed run leaves the partial file behind with every
+    flushed row in it.
+    """
+
+    def __init__(self, directory: str, stem: str, batch_size: int = 50, encoding: str = 'utf-8-sig',
+                 columns: Optional[List[str]] = None):
+        self.directory = directory
+        self.stem = stem
+        self.batch_size = batch_size
+        self.path = os.path.join(directory, f"{stem}.partial.csv")
+        self.count = 0
+        self.buffer: List[BusinessRecord] = []
+        self.columns = columns or COLUMNS
+        # Positions of the projected fields, or None to write records whole
+        self.indices = None if self.columns == FIELDS else [FIELDS.index(column) for column in self.columns]
+        os.makedirs(directory, exist_ok=True)
+        self.file = open(self.path, 'w', newline='', encoding=encoding)
+        self.writer = csv.writer(self.file, lineterminator='\n')
+        self.writer.writerow(self.columns)
+
+    def write(self, record: BusinessRecord):
+        self.buffer.append(record)
+        self.count += 1
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            if self.indices is None:
+                self.writer.writerows(self.buffer)
+            else:
+                self.writer.writerows([record[i] for i in self.indices] for record in self.buffer)
+            self.buffer.clear()
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def finish(self, filename: str) -> str:
+        """Flush, close and move the file to ``filename`` in the same directory. Returns the new path."""
+        self.close()
+        final_path = os.path.join(self.directory, filename)
+        os.replace(self.path, final_path)
+        self.path = final_path
+        return final_path
+
+    def discard(self):
+        """Close and delete the file, e.g. when nothing was written."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,123 @@
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from settings import RENDER_POLICY_PATH, RENDER_POLICY_TTL
+
+HTTP = 'http'
+BROWSER = 'browser'
+
+
+class PageMarkers(NamedTuple):
+    """What a fully rendered page of one kind contains."""
+    needles: Tuple[bytes, ...]  # Any of these in the static HTML means it is complete
+    wait_for: str  # CSS selector Chrome waits for when the page has to be rendered
+
+
+SEARCH_PAGE = PageMarkers((b'listing_container', b'results_info'), '.listing_container, .results_info')
+DETAIL_PAGE = PageMarkers((b'<h1',), 'h1')
+
+
+def url_pattern(url: str) -> str:
+    """
+    Group URLs that share a page template.
+
+    Only the host, the first path segment and the path depth are kept, so
+    ``/business/acme-ltd/123`` and ``/business/other/456`` fall under the
+    same pattern while search pages get their own.
+    """
+    parts = urllib.parse.urlsplit(url)
+    segments = [segment for segment in parts.path.split('/') if segment]
+    if not segments:
+        return f"{parts.netloc}/"
+    return f"{parts.netloc}/{segments[0]}" + '/*' * (len(segments) - 1)
+
+
+def has_markers(content: bytes, markers: PageMarkers) -> bool:
+    return any(needle in content for needle in markers.needles)
+
+
+class RenderPolicy:
+    """
+    Remembers, per URL pattern, whether pages need a headless browser.
+
+    Pages are fetched over plain HTTP first. When the static HTML lacks the
+    page's markers and a rendered copy has them, the pattern is switched to
+    the browser so later pages of that kind skip the wasted HTTP request.
+    Decisions are shared through SQLite by every process on the host and
+    expire after ``ttl`` seconds, after which HTTP is tried again.
+    """
+
+    def __init__(self, path: str = RENDER_POLICY_PATH, ttl: int = RENDER_POLICY_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.decisions: Dict[str, Tuple[str, float]] = {}  # pattern -> (mode, decided_at)
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS decisions (
+                    pattern TEXT PRIMARY KEY,
+                    mode TEXT NOT NULL,
+                    decided_at REAL NOT NULL
+                )
+            """)
+
+    def _decision(self, pattern: str) -> Optional[Tuple[str, float]]:
+        with self.lock:
+            decision = self.decisions.get(pattern)
+        if decision is None:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT mode, decided_at FROM decisions WHERE pattern = ?", (pattern,)
+                ).fetchone()
+            if row is None:
+                return None
+            decision = (row[0], row[1])
+            with self.lock:
+                self.decisions[pattern] = decision
+        return decision
+
+    def mode(self, url: str) -> str:
+        """HTTP or BROWSER for this URL's pattern. Unknown and expired patterns start with HTTP."""
+        decision = self._decision(url_pattern(url))
+        if decision is None or time.time() - decision[1] >= self.ttl:
+            return HTTP
+        return decision[0]
+
+    def remember(self, url: str, mode: str):
+        """Record how pages like ``url`` should be fetched. Unchanged decisions are not rewritten."""
+        pattern = url_pattern(url)
+        decision = self._decision(pattern)
+        if decision and decision[0] == mode and time.time() - decision[1] < self.ttl:
+            return
+
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO decisions (pattern, mode, decided_at) VALUES (?, ?, ?)",
+                (pattern, mode, now)
+            )
+        with self.lock:
+            self.decisions[pattern] = (mode, now)
+        print(f"Fetching {pattern} pages with {mode}")
+
+    def stats(self) -> Dict[str, str]:
+        """Current decision per pattern."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT pattern, mode, decided_at FROM decisions ORDER BY pattern").fetchall()
+        now = time.time()
+        return {pattern: mode if now - decided_at < self.ttl else f"{mode} (expired)"
+                for pattern, mode, decided_at in rows}
@@ -0,0 +1,294 @@
+"""
+Record Golden Pages pages into a local archive and replay them over HTTP.
+
+Recording (hits the live site, politely):
+    python replay_server.py record --what plumber --where Dublin --pages 3 --details 40
+
+Serving the archive with simulated latency and failures:
+    python replay_server.py serve --port 8765 --latency 0.3 --jitter 0.1 --rate-429 0.02
+
+Then point the scraper at it with GOLDEN_PAGES_BASE_URL=http://127.0.0.1:8765
+or GoldenPagesScraper(base_url=...).
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from settings import GOLDEN_PAGES_BASE_URL
+
+DEFAULT_ARCHIVE = os.path.join('fixtures', 'goldenpages')
+
+# (status, content type, body)
+Page = Tuple[int, str, bytes]
+
+
+class FixtureArchive:
+    """
+    Directory of recorded pages.
+
+    ``index.json`` maps each request path (with query string) to its status,
+    content type and gzipped body file. Bodies keep the live site's absolute
+    links; the replay server rewrites them to its own address when serving.
+    """
+
+    def __init__(self, path: str = DEFAULT_ARCHIVE):
+        self.path = path
+        self.index_file = os.path.join(path, 'index.json')
+        self.index: Dict[str, Dict] = {}
+        if os.path.exists(self.index_file):
+            with open(self.index_file, encoding='utf-8') as f:
+                self.index = json.load(f)
+
+    def add(self, path: str, status: int, content_type: str, body: bytes):
+        """Store a page under its request path."""
+        os.makedirs(self.path, exist_ok=True)
+        filename = hashlib.sha1(path.encode('utf-8')).hexdigest() + '.gz'
+        with gzip.open(os.path.join(self.path, filename), 'wb') as f:
+            f.write(body)
+        self.index[path] = {'status': status, 'content_type': content_type, 'file': filename}
+
+    def get(self, path: str) -> Optional[Page]:
+        entry = self.index.get(path)
+        if entry is None:
+            return None
+        with gzip.open(os.path.join(self.path, entry['file']), 'rb') as f:
+            return entry['status'], entry['content_type'], f.read()
+
+    def paths(self) -> List[str]:
+        return list(self.index)
+
+    def save(self):
+        os.makedirs(self.path, exist_ok=True)
+        with open(self.index_file, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=2, sort_keys=True)
+
+
+class FixtureRecorder:
+    """Captures search pages, detail pages and the sitemap from the live site."""
+
+    def __init__(self, archive: FixtureArchive, base_url: str = GOLDEN_PAGES_BASE_URL):
+        # Imported here so serving an archive doesn't load the whole web app
+        from app import GoldenPagesScraper
+        self.archive = archive
+        self.scraper = GoldenPagesScraper(base_url=base_url)
+
+    def _record(self, url: str):
+        """Fetch a URL through the scraper's polite fetch path and store it."""
+        response = self.scraper.make_request_with_retry(url)
+        if response is None:
+            print(f"Could not record {url}")
+            return None
+
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path + (f"?{parts.query}" if parts.query else '')
+        content_type = response.headers.get('content-type', 'text/html; charset=utf-8')
+        self.archive.add(path, response.status_code, content_type, response.content)
+        print(f"Recorded {path} ({len(response.content)} bytes)")
+        return response
+
+    def record_search(self, what: str, where: str, max_pages: int = 2, max_details: int = 20):
+        """Record up to ``max_pages`` results pages and ``max_details`` detail pages."""
+        from bs4 import BeautifulSoup
+
+        url = (f"{self.scraper.base_url}/q/business/advanced/where/"
+               f"{urllib.parse.quote(where.replace(' ', '+'))}/what/"
+               f"{urllib.parse.quote(what.replace(' ', '+'))}/1")
+        details = 0
+
+        for _ in range(max_pages):
+            response = self._record(url)
+            if response is None:
+                break
+
+            soup = BeautifulSoup(response.content, 'lxml')
+            for listing in soup.find_all('div', {'class': 'listing_container'}):
+                card = self.scraper.parse_listing_card(listing)
+                if card and card[1] and details < max_details:
+                    if self._record(card[1]) is not None:
+                        details += 1
+
+            url = self.scraper.find_next_page_url(soup)
+            if not url:
+                break
+
+    def record_sitemap(self, max_details: int = 20):
+        """Record the sitemap and up to ``max_details`` business pages it links to."""
+        from bs4 import BeautifulSoup
+
+        response = self._record(f"{self.scraper.base_url}/business/sitemap")
+        if response is None:
+            return
+
+        soup = BeautifulSoup(response.content, 'lxml')
+        links = soup.find_all('a', href=lambda href: href and '/business/' in href)
+        for link in links[:max_details]:
+            href = link['href']
+            self._record(href if href.startswith('http') else f"{self.scraper.base_url}{href}")
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    Local HTTP stand-in for Golden Pages.
+
+    Serves pages from any source with a ``get(path)`` method (a
+    ``FixtureArchive`` or a generated site), after ``latency`` +/- ``jitter``
+    seconds. A fraction of requests can be answered with 429 (with
+    Retry-After) or 403 instead. Live-site links in bodies are rewritten to
+    point back at the server, and ETags allow conditional requests.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, source, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 jitter: float = 0.0, rate_429: float = 0.0, rate_403: float = 0.0,
+                 retry_after: int = 1, seed: Optional[int] = None,
+                 live_base_url: str = 'https://www.goldenpages.ie'):
+        super().__init__((host, port), ReplayHandler)
+        self.source = source
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.rate_403 = rate_403
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.live_base_url = live_base_url.encode('utf-8')
+        # Handler threads update the counters concurrently
+        self.stats_lock = threading.Lock()
+        self.requests_served = 0
+        self.request_times: List[float] = []  # time.monotonic() of every request, for rate checks
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Serve from a background thread and return the server's base URL."""
+        self.thread = threading.Thread(target=self.serve_forever, name='replay-server', daemon=True)
+        self.thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def record_request(self):
+        with self.stats_lock:
+            self.requests_served += 1
+            self.request_times.append(time.monotonic())
+
+    def reset_stats(self):
+        """Zero the request counters, e.g. between benchmark scenarios."""
+        with self.stats_lock:
+            self.requests_served = 0
+            self.request_times.clear()
+
+    def roll(self) -> Tuple[float, Optional[int]]:
+        """Pick this request's delay and injected error status, if any."""
+        with self.random_lock:
+            delay = max(self.latency + self.random.uniform(-self.jitter, self.jitter), 0.0)
+            draw = self.random.random()
+        if draw < self.rate_429:
+            return delay, 429
+        if draw < self.rate_429 + self.rate_403:
+            return delay, 403
+        return delay, None
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        server.record_request()
+        delay, error_status = server.roll()
+        if delay:
+            time.sleep(delay)
+
+        if error_status:
+            headers = {'Retry-After': str(server.retry_after)} if error_status == 429 else {}
+            self._send(error_status, 'text/plain', b'Simulated error', headers)
+            return
+
+        page = server.source.get(self.path)
+        if page is None:
+            self._send(404, 'text/plain', b'Not recorded')
+            return
+
+        status, content_type, body = page
+        body = body.replace(server.live_base_url, server.base_url.encode('utf-8'))
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self._send(304, content_type, b'', {'ETag': etag})
+            return
+        self._send(status, content_type, body, {'ETag': etag})
+
+    def _send(self, status: int, content_type: str, body: bytes, headers: Optional[Dict] = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output readable
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record and replay Golden Pages fixtures')
+    parser.add_argument('--archive', default=DEFAULT_ARCHIVE, help='Fixture archive directory')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record = commands.add_parser('record', help='Record pages from the live site')
+    record.add_argument('--what', help='Business type to search for')
+    record.add_argument('--where', help='Location to search in')
+    record.add_argument('--pages', type=int, default=2, help='Search result pages to record')
+    record.add_argument('--details', type=int, default=20, help='Detail pages to record')
+    record.add_argument('--sitemap', action='store_true', help='Also record the business sitemap')
+
+    serve = commands.add_parser('serve', help='Replay an archive over HTTP')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    serve.add_argument('--jitter', type=float, default=0.0, help='Random +/- seconds around the latency')
+    serve.add_argument('--rate-429', type=float, default=0.0, help='Fraction of requests answered with 429')
+    serve.add_argument('--rate-403', type=float, default=0.0, help='Fraction of requests answered with 403')
+    serve.add_argument('--seed', type=int, help='Random seed for reproducible runs')
+
+    args = parser.parse_args()
+    archive = FixtureArchive(args.archive)
+
+    if args.command == 'record':
+        recorder = FixtureRecorder(archive)
+        if args.what and args.where:
+            recorder.record_search(args.what, args.where, args.pages, args.details)
+        if args.sitemap:
+            recorder.record_sitemap(args.details)
+        archive.save()
+        print(f"Archive {args.archive} holds {len(archive.paths())} pages")
+        return
+
+    server = ReplayServer(archive, args.host, args.port, args.latency, args.jitter,
+                          args.rate_429, args.rate_403, seed=args.seed)
+    print(f"Replaying {len(archive.paths())} pages from {args.archive} at {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -72,13 +72,18 @@ class GoldenPagesScraper:
                 location_input.clear()
                 location_input.send_keys(town)
                 self._add_random_delay(0.5, 1)
+                search_page_url = self.driver.current_url
                 location_input.send_keys(Keys.RETURN)
                 
             except TimeoutException:
                 raise Exception("Could not find the search form")
             
-            # Wait for results to load
-            time.sleep(3)  # Give time for the results to load
+            # Wait for the results page to replace the search page; the listing
+            # wait below then covers the results themselves
+            try:
+                WebDriverWait(self.driver, 10).until(EC.url_changes(search_page_url))
+            except TimeoutException:
+                print("Search did not navigate to a results page")
             
             page_num = 1
             while True:
@@ -126,7 +131,10 @@ class GoldenPagesScraper:
                     next_button = self.driver.find_element(By.CLASS_NAME, "next")
                     if not next_button.is_displayed() or not next_button.is_enabled():
                         break
+                    first_listing = self.driver.find_element(By.CLASS_NAME, "listing")
                     next_button.click()
+                    # Make sure the old page is gone before reading listings again
+                    WebDriverWait(self.driver, 10).until(EC.staleness_of(first_listing))
                     self._add_random_delay()
                     page_num += 1
                 except NoSuchElementException:
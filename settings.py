@@ -0,0 +1,71 @@
+import os
+from pathlib import Path
+
+# Runtime settings shared by the web app and the background workers.
+# Every value can be overridden through an environment variable so that
+# all gunicorn workers on a host pick up the same configuration.
+
+# Site to scrape; point this at a replay_server.py stand-in for offline runs
+GOLDEN_PAGES_BASE_URL = os.environ.get('GOLDEN_PAGES_BASE_URL', 'https://www.goldenpages.ie').rstrip('/')
+
+# Directory for shared state (job store, caches, journals)
+DATA_DIR = os.environ.get('GEMLEADS_DATA_DIR', str(Path.home() / ".gemleads"))
+
+# Where search exports are written and served from
+DOWNLOADS_DIR = os.environ.get('GEMLEADS_DOWNLOADS_DIR', str(Path.home() / "Downloads"))
+
+# Background job queue
+JOBS_DB_PATH = os.environ.get('GEMLEADS_JOBS_DB', os.path.join(DATA_DIR, 'jobs.sqlite3'))
+JOB_WORKERS = int(os.environ.get('GEMLEADS_JOB_WORKERS', 2))  # Concurrent jobs per process
+JOB_QUEUE_LIMIT = int(os.environ.get('GEMLEADS_JOB_QUEUE_LIMIT', 8))  # Queued + running jobs per process
+JOB_STALE_AFTER = int(os.environ.get('GEMLEADS_JOB_STALE_AFTER', 1800))  # Seconds without updates before an active job is presumed dead
+JOB_EVENTS_STREAM_SECONDS = float(os.environ.get('GEMLEADS_JOB_EVENTS_STREAM_SECONDS', 25))  # Progress streams end before gunicorn's 30s worker timeout; EventSource reconnects
+SEARCH_CACHE_TTL = int(os.environ.get('GEMLEADS_SEARCH_CACHE_TTL', 24 * 3600))  # Seconds a finished search is reused; 0 disables
+SEARCH_PAGE_LOOKAHEAD = int(os.environ.get('GEMLEADS_SEARCH_PAGE_LOOKAHEAD', 2))  # Planned result pages downloaded ahead
+JOURNAL_DIR = os.environ.get('GEMLEADS_JOURNAL_DIR', os.path.join(DATA_DIR, 'journals'))  # Checkpoints for resuming jobs
+JOURNAL_RETENTION = int(os.environ.get('GEMLEADS_JOURNAL_RETENTION', 7 * 24 * 3600))  # Seconds a failed job's checkpoint is kept for resuming
+SITEMAP_MAX_BUSINESSES = int(os.environ.get('GEMLEADS_SITEMAP_MAX_BUSINESSES', 0))  # Business pages per sitemap crawl; 0 means no limit
+
+# Crawl frontier: URL dedup and queues that spill to disk
+FRONTIER_DIR = os.environ.get('GEMLEADS_FRONTIER_DIR', os.path.join(DATA_DIR, 'frontiers'))
+FRONTIER_BLOOM_CAPACITY = int(os.environ.get('GEMLEADS_FRONTIER_BLOOM_CAPACITY', 1_000_000))  # URLs per crawl before the filter degrades (~1.2 MB)
+FRONTIER_MEMORY_LIMIT = int(os.environ.get('GEMLEADS_FRONTIER_MEMORY_LIMIT', 10_000))  # Queued URLs held in memory per priority
+
+# Detail page extraction in worker processes (per process)
+EXTRACT_WORKERS = int(os.environ.get('GEMLEADS_EXTRACT_WORKERS', max((os.cpu_count() or 1) - 1, 0)))  # 0 extracts inline
+EXTRACT_QUEUE_LIMIT = int(os.environ.get('GEMLEADS_EXTRACT_QUEUE_LIMIT', 16))  # Pages handed to the workers and not yet extracted
+
+# On-disk HTTP cache for Golden Pages pages
+HTTP_CACHE_ENABLED = os.environ.get('GEMLEADS_HTTP_CACHE', '1') != '0'
+HTTP_CACHE_PATH = os.environ.get('GEMLEADS_HTTP_CACHE_PATH', os.path.join(DATA_DIR, 'http_cache.sqlite3'))
+HTTP_CACHE_TTL = int(os.environ.get('GEMLEADS_HTTP_CACHE_TTL', 6 * 3600))  # Seconds an entry is served without revalidation
+HTTP_CACHE_MAX_BYTES = int(os.environ.get('GEMLEADS_HTTP_CACHE_MAX_BYTES', 256 * 1024 * 1024))  # Compressed size limit
+
+# Headless Chrome pool (per process)
+DRIVER_POOL_SIZE = int(os.environ.get('GEMLEADS_DRIVER_POOL_SIZE', 2))  # Concurrent Chrome instances
+DRIVER_MAX_PAGES = int(os.environ.get('GEMLEADS_DRIVER_MAX_PAGES', 200))  # Pages before a driver is replaced
+DRIVER_MAX_RSS_MB = float(os.environ.get('GEMLEADS_DRIVER_MAX_RSS_MB', 1024))  # Chrome memory before a driver is replaced; 0 disables
+DRIVER_ACQUIRE_TIMEOUT = float(os.environ.get('GEMLEADS_DRIVER_ACQUIRE_TIMEOUT', 120))  # Seconds to wait for a free driver
+DRIVER_LAUNCH_RETRY_AFTER = float(os.environ.get('GEMLEADS_DRIVER_LAUNCH_RETRY_AFTER', 300))  # Seconds Chrome isn't retried after a failed launch
+DRIVER_WAIT_TIMEOUT = float(os.environ.get('GEMLEADS_DRIVER_WAIT_TIMEOUT', 10))  # Max seconds to wait for a page element
+DRIVER_BLOCK_RESOURCES = os.environ.get('GEMLEADS_DRIVER_BLOCK_RESOURCES', '1') != '0'  # Skip images/fonts/media/trackers
+
+# Per-page choice between plain HTTP and headless Chrome
+RENDER_FALLBACK = os.environ.get('GEMLEADS_RENDER_FALLBACK', '1') != '0'  # Render pages whose static HTML is incomplete
+RENDER_POLICY_PATH = os.environ.get('GEMLEADS_RENDER_POLICY_PATH', os.path.join(DATA_DIR, 'render_policy.sqlite3'))
+RENDER_POLICY_TTL = int(os.environ.get('GEMLEADS_RENDER_POLICY_TTL', 24 * 3600))  # Seconds before HTTP is retried for a browser-only pattern
+
+# Fetch engine politeness (per process, per host)
+FETCH_MIN_INTERVAL = float(os.environ.get('GEMLEADS_FETCH_MIN_INTERVAL', 2))  # Seconds between requests to one host
+FETCH_MAX_CONNECTIONS = int(os.environ.get('GEMLEADS_FETCH_MAX_CONNECTIONS', 4))
+FETCH_TIMEOUT = float(os.environ.get('GEMLEADS_FETCH_TIMEOUT', 15))
+FETCH_PREFETCH_LIMIT = int(os.environ.get('GEMLEADS_FETCH_PREFETCH_LIMIT', 32))  # Responses held ahead of use
+FETCH_RESPECT_ROBOTS = os.environ.get('GEMLEADS_FETCH_RESPECT_ROBOTS', '1') != '0'
+
+# Adaptive (AIMD) rate control per host, in requests per second. The ceiling
+# is 1 / GEMLEADS_FETCH_MIN_INTERVAL.
+RATE_FLOOR = float(os.environ.get('GEMLEADS_RATE_FLOOR', 0.05))  # Never slower than one request per 20s
+RATE_DECREASE_FACTOR = float(os.environ.get('GEMLEADS_RATE_DECREASE_FACTOR', 0.5))  # Multiplier after throttling/errors
+RATE_INCREASE_STEP = float(os.environ.get('GEMLEADS_RATE_INCREASE_STEP', 0.05))  # Added after a run of successes
+RATE_SUCCESS_THRESHOLD = int(os.environ.get('GEMLEADS_RATE_SUCCESS_THRESHOLD', 10))  # Successes per increase
+RATE_MAX_RETRY_AFTER = float(os.environ.get('GEMLEADS_RATE_MAX_RETRY_AFTER', 600))  # Cap on honoured Retry-After
@@ -0,0 +1,120 @@
+import gzip
+import io
+import urllib.parse
+from typing import Iterator, Tuple
+
+# lxml is imported where a sitemap is parsed, so web workers that import the
+# link kinds below don't load it at boot
+
+# Link kinds yielded by iter_sitemap()
+SITEMAP = 'sitemap'
+PAGE = 'page'
+
+GZIP_MAGIC = b'\x1f\x8b'
+CHUNK_SIZE = 64 * 1024
+
+
+def _open(content: bytes):
+    """File object over a sitemap body, decompressing .xml.gz sitemaps on the fly."""
+    stream = io.BytesIO(content)
+    return gzip.GzipFile(fileobj=stream) if content[:2] == GZIP_MAGIC else stream
+
+
+def _is_xml(stream) -> bool:
+    head = stream.read(1024).lstrip()
+    stream.seek(0)
+    return head.startswith(b'<?xml') or b'<urlset' in head or b'<sitemapindex' in head
+
+
+def _release(elem):
+    """Free an element and everything parsed before it, so the tree never grows."""
+    elem.clear()
+    for node in [elem, *elem.iterancestors()]:
+        parent = node.getparent()
+        if parent is None:
+            break
+        while node.getprevious() is not None:
+            del parent[0]
+
+
+def _local_name(tag) -> str:
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+
+class _LinkCollector:
+    """lxml parser target that keeps the href of every <a> and builds no tree."""
+
+    def __init__(self):
+        self.links = []
+
+    def start(self, tag, attrib):
+        if tag == 'a' and attrib.get('href'):
+            self.links.append(attrib['href'])
+
+    def end(self, tag):
+        pass
+
+    def data(self, data):
+        pass
+
+    def close(self):
+        pass
+
+
+def _iter_html_links(stream) -> Iterator[str]:
+    from lxml import etree
+
+    # libxml2's HTML parser doesn't free pruned elements, so HTML sitemaps are
+    # read as a stream of start tags instead of an iterparse tree
+    collector = _LinkCollector()
+    parser = etree.HTMLParser(target=collector)
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        parser.feed(chunk)
+        yield from collector.links
+        collector.links.clear()
+    parser.close()
+    yield from collector.links
+
+
+def iter_sitemap(content: bytes, base_url: str) -> Iterator[Tuple[str, str]]:
+    """
+    Yield ``(kind, url)`` for every link in a sitemap, as it is parsed.
+
+    XML sitemaps (urlsets and sitemap indexes, optionally gzipped) and HTML
+    sitemap pages are both understood. ``kind`` is SITEMAP for links to
+    further sitemaps and PAGE for business pages; other links are skipped.
+    Elements are discarded as soon as they are read, so memory stays flat
+    however many links the sitemap holds.
+
+    Args:
+        content (bytes): Sitemap response body
+        base_url (str): URL the sitemap was fetched from, for relative links
+    """
+    from lxml import etree
+
+    stream = _open(content)
+    try:
+        if _is_xml(stream):
+            # No entity expansion or network access for remote XML
+            events = etree.iterparse(stream, events=('end',), tag=('{*}url', '{*}sitemap'),
+                                     resolve_entities=False, no_network=True, recover=True)
+            for _, elem in events:
+                kind = SITEMAP if _local_name(elem.tag) == 'sitemap' else PAGE
+                loc = next((child.text for child in elem if _local_name(child.tag) == 'loc'), None)
+                _release(elem)
+                url = (loc or '').strip()
+                if url:
+                    yield kind, urllib.parse.urljoin(base_url, url)
+        else:
+            for href in _iter_html_links(stream):
+                if '/business/' not in href:
+                    continue
+                url = urllib.parse.urljoin(base_url, href)
+                path = urllib.parse.urlsplit(url).path
+                yield (SITEMAP if 'sitemap' in path else PAGE), url
+    except etree.LxmlError as e:
+        print(f"Stopped reading sitemap {base_url}: {e}")
+
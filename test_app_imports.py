@@ -0,0 +1,19 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.import_time import HEAVY_MODULES
+
+PROBE = 'import json, sys; import app; print(json.dumps([m for m in json.loads(sys.argv[1]) if m in sys.modules]))'
+
+
+def test_web_worker_boot_loads_no_heavy_modules():
+    data_dir = tempfile.mkdtemp(prefix='gemleads-test-')
+    env = dict(os.environ, GEMLEADS_DATA_DIR=data_dir, GEMLEADS_DOWNLOADS_DIR=os.path.join(data_dir, 'downloads'))
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE, json.dumps(HEAVY_MODULES)],
+        capture_output=True, text=True, env=env, check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    ).stdout
+    assert json.loads(output.strip().splitlines()[-1]) == []
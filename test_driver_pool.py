@@ -0,0 +1,143 @@
+import fnmatch
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+from driver_pool import DriverPool, DriverUnavailable, block_resources, wait_for_element
+
+
+class FakeDriver:
+    def __init__(self):
+        self.loaded = []
+        self.quit_called = False
+
+    def get(self, url):
+        self.loaded.append(url)
+
+    def find_element(self, by, value):
+        raise NoSuchElementException(value)
+
+    @property
+    def page_source(self):
+        return '<html><body>No results</body></html>'
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_driver_is_recycled_after_max_pages_within_one_checkout():
+    drivers = []
+    pool = DriverPool(max_drivers=1, max_pages=3, max_rss_mb=0,
+                      factory=lambda: drivers.append(FakeDriver()) or drivers[-1])
+
+    with pool.driver() as driver:
+        for page in range(5):
+            driver.get(f'https://example.ie/{page}')
+
+    assert drivers[0].loaded == [f'https://example.ie/{page}' for page in range(5)]
+    assert drivers[0].quit_called
+    assert pool.stats()['recycled'] == 1
+
+
+def test_driver_is_reused_while_under_max_pages():
+    pool = DriverPool(max_drivers=1, max_pages=3, max_rss_mb=0, factory=FakeDriver)
+
+    for _ in range(2):
+        with pool.driver() as driver:
+            driver.get('https://example.ie/')
+
+    assert pool.stats() == {'size': 1, 'idle': 1, 'max_drivers': 1, 'launched': 1, 'recycled': 0, 'launch_failed': False}
+
+
+class CdpDriver(FakeDriver):
+    def __init__(self):
+        super().__init__()
+        self.commands = {}
+
+    def execute_cdp_cmd(self, command, params):
+        self.commands[command] = params
+
+
+def blocked(driver, url):
+    return any(fnmatch.fnmatchcase(url, pattern) for pattern in driver.commands['Network.setBlockedURLs']['urls'])
+
+
+def test_versioned_assets_are_blocked():
+    driver = CdpDriver()
+    block_resources(driver)
+
+    assert blocked(driver, 'https://cdn.example.ie/logo.png?v=3')
+    assert blocked(driver, 'https://cdn.example.ie/fonts/inter.woff2?display=swap')
+    assert blocked(driver, 'https://cdn.example.ie/logo.png')
+    assert not blocked(driver, 'https://www.goldenpages.ie/business/acme')
+    assert not blocked(driver, 'https://cdn.example.ie/app.js?v=3')
+
+
+def test_allowed_kinds_are_not_blocked():
+    driver = CdpDriver()
+    block_resources(driver, allow=('images',))
+
+    assert not blocked(driver, 'https://cdn.example.ie/logo.png?v=3')
+    assert blocked(driver, 'https://cdn.example.ie/fonts/inter.woff2?display=swap')
+
+
+def test_timed_out_wait_leaves_the_driver_in_the_pool():
+    pool = DriverPool(max_drivers=1, max_pages=10, max_rss_mb=0, factory=FakeDriver)
+
+    with pytest.raises(TimeoutException):
+        with pool.driver() as driver:
+            driver.get('https://example.ie/q/nothing')
+            wait_for_element(driver, '.listing_container', timeout=0.1)
+
+    assert pool.stats() == {'size': 1, 'idle': 1, 'max_drivers': 1, 'launched': 1, 'recycled': 0, 'launch_failed': False}
+
+
+def test_other_errors_still_recycle_the_driver():
+    pool = DriverPool(max_drivers=1, max_pages=10, max_rss_mb=0, factory=FakeDriver)
+
+    with pytest.raises(RuntimeError):
+        with pool.driver():
+            raise RuntimeError('session deleted')
+
+    assert pool.stats()['size'] == 0
+    assert pool.stats()['recycled'] == 1
+
+
+def test_render_page_returns_the_page_when_its_marker_never_appears(monkeypatch):
+    import app
+
+    monkeypatch.setattr(app, 'wait_for_element', lambda driver, css: wait_for_element(driver, css, timeout=0.1))
+    pool = DriverPool(max_drivers=1, max_pages=10, max_rss_mb=0, factory=FakeDriver)
+    scraper = app.GoldenPagesScraper.__new__(app.GoldenPagesScraper)
+    scraper.driver_pool = pool
+    scraper.stage_times = {'render': 0.0}
+
+    html = scraper.render_page('https://example.ie/q/nothing', wait_for='.listing_container')
+
+    assert 'No results' in html
+    assert pool.stats()['idle'] == 1
+
+
+def test_failed_launch_is_not_retried_until_the_backoff_expires():
+    attempts = []
+
+    def missing_chrome():
+        attempts.append(1)
+        raise OSError('chrome not found')
+
+    pool = DriverPool(max_drivers=2, max_pages=10, max_rss_mb=0, launch_retry_after=60, factory=missing_chrome)
+
+    with pytest.raises(OSError):
+        pool.acquire()
+    for _ in range(3):
+        with pytest.raises(DriverUnavailable):
+            pool.acquire()
+
+    assert len(attempts) == 1
+    assert pool.stats()['size'] == 0
+    assert pool.stats()['launch_failed']
+
+    pool.launch_failed_at -= 60
+    pool.factory = FakeDriver
+    pool.release(pool.acquire())
+    assert not pool.stats()['launch_failed']
@@ -0,0 +1,71 @@
+from bs4 import BeautifulSoup
+
+from benchmarks.synthetic_site import SyntheticSite
+from extractors import extract_details
+
+
+def test_detail_pages_yield_every_published_field():
+    site = SyntheticSite(listings=40)
+
+    for index in range(site.listings):
+        business = site._business(index)[1]
+        details = extract_details(site.detail_page(index))
+
+        assert details['name'] == business['name']
+        assert details['phone'] == business['phone']
+        assert details['additional_phones'] == [business['mobile']]
+        assert details['email'] == business['email']
+        assert 'additional_emails' not in details
+        assert details['website'] == business['website']
+        assert details['location'] == business['address']
+        assert details['categories'] == business['categories']
+
+
+PAGE = b'''<html><body>
+<h1> Acme  Plumbing </h1><h1>Other heading</h1>
+<div class="contact-box">
+  <a href="tel:01 234 5678">Call</a>
+  <span class="tel">Tel: 01 234 5678</span>
+  <span class="mobile-number">087 765 4321</span>
+  <a class="mail" href="mailto:Sales@Acme.ie?subject=Quote">Email</a>
+  <p class="email-text">or info@acme.com</p>
+</div>
+<a href="https://www.facebook.com/acme">Our website on Facebook</a>
+<a href="https://www.acme.ie/">Visit website</a>
+<a href="https://www.acme-other.ie/"><i class="globe"></i></a>
+<span class="address-line">1 Main St, <b>Dublin</b></span>
+<p class="categories">Not this one</p>
+<div class="categories-list">Plumbers, <span>Heating</span></div>
+</body></html>'''
+
+
+def reference_details(content):
+    """The fields the former BeautifulSoup implementation picked out with one find per field."""
+    soup = BeautifulSoup(content, 'lxml')
+    website = next(
+        a['href'].lower() for a in soup.find_all('a', href=True)
+        if ('website' in str(a).lower() or 'globe' in str(a).lower()) and a['href'].lower().startswith('http')
+        and not any(host in a['href'].lower() for host in ('goldenpages', 'facebook', 'twitter', 'linkedin'))
+    )
+    return {
+        'name': soup.find('h1').text.strip(),
+        'website': website,
+        'location': soup.find(['div', 'span', 'p'], {'class': lambda x: x and 'address' in str(x).lower()}).get_text(strip=True),
+        'categories': soup.find(['div', 'span'], {'class': lambda x: x and 'categor' in str(x).lower()}).get_text(strip=True),
+    }
+
+
+def test_single_pass_matches_the_former_per_field_lookups():
+    details = extract_details(PAGE)
+
+    for field, value in reference_details(PAGE).items():
+        assert details[field] == value
+    # Phones and emails come in document order, each once
+    assert details['phone'] == '01 234 5678'
+    assert details['additional_phones'] == ['087 765 4321']
+    assert details['email'] == 'sales@acme.ie'
+    assert details['additional_emails'] == ['info@acme.com']
+
+
+def test_page_without_details_yields_nothing():
+    assert extract_details(b'<html><body><p>Nothing here</p></body></html>') == {}
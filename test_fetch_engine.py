@@ -0,0 +1,35 @@
+import os
+import tempfile
+from concurrent.futures import Future
+
+# Settings are read at import time, so keep the job store out of ~/.gemleads
+os.environ.setdefault('GEMLEADS_DATA_DIR', tempfile.mkdtemp(prefix='gemleads-test-'))
+os.environ.setdefault('GEMLEADS_DOWNLOADS_DIR', os.path.join(os.environ['GEMLEADS_DATA_DIR'], 'downloads'))
+
+import app  # noqa: E402
+from fetch_engine import FetchEngine  # noqa: E402
+
+
+class StalledEngine(FetchEngine):
+    """Prefetches that never complete, like downloads from a slow host."""
+
+    def _submit(self, url, headers, proxy):
+        return Future()
+
+
+def test_abandoned_scrape_frees_its_prefetch_slots():
+    engine = StalledEngine(prefetch_limit=4)
+    scraper = app.GoldenPagesScraper(base_url='http://example.invalid')
+    scraper.fetch_engine, scraper.render_policy, scraper.http_cache = engine, None, None
+
+    urls = [f"http://example.invalid/business/{index}" for index in range(4)]
+    scraper.prefetch(urls)
+    futures = [future for future, _ in engine.prefetched.values()]
+    assert len(futures) == 4
+
+    scraper.cancel_prefetches()
+
+    assert not engine.prefetched
+    assert all(future.cancelled() for future in futures)
+    scraper.prefetch(urls[:1])  # The slots are free for the next scrape
+    assert list(engine.prefetched) == urls[:1]
@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+import frontier
+from frontier import ScratchDir, UrlFrontier, sweep_scratch_dirs
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def test_sweep_removes_scratch_of_dead_crawls_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(frontier, 'FRONTIER_DIR', str(tmp_path))
+    live = ScratchDir()
+    UrlFrontier(directory=live.path)  # Left open, as by a crawl still running
+    (tmp_path / f"pid{dead_pid()}-abc").mkdir()
+    (tmp_path / 'finished-job').mkdir()
+    (tmp_path / 'running-job').mkdir()
+    (tmp_path / 'frontier-old.sqlite3').write_bytes(b'')
+
+    sweep_scratch_dirs(lambda job_id: job_id == 'running-job')
+
+    assert sorted(os.listdir(tmp_path)) == sorted([os.path.basename(live.path), 'running-job'])
+
+
+def test_resumed_job_starts_with_empty_scratch(tmp_path, monkeypatch):
+    monkeypatch.setattr(frontier, 'FRONTIER_DIR', str(tmp_path))
+    killed = ScratchDir('job1')
+    UrlFrontier(directory=killed.path).add('https://example.ie/a')  # Never closed
+
+    resumed = ScratchDir('job1')
+    assert os.listdir(resumed.path) == []
+    with UrlFrontier(directory=resumed.path) as urls:
+        assert urls.add('https://example.ie/a')
+    resumed.remove()
+    assert os.listdir(tmp_path) == []
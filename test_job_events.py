@@ -0,0 +1,48 @@
+import os
+import tempfile
+import time
+
+# Settings are read at import time, so keep the job store out of ~/.gemleads
+os.environ.setdefault('GEMLEADS_DATA_DIR', tempfile.mkdtemp(prefix='gemleads-test-'))
+os.environ.setdefault('GEMLEADS_DOWNLOADS_DIR', os.path.join(os.environ['GEMLEADS_DATA_DIR'], 'downloads'))
+
+import app  # noqa: E402
+
+GUNICORN_TIMEOUT = 30  # gunicorn's default worker timeout
+
+
+def test_stream_limit_is_inside_worker_timeout():
+    assert app.JOB_EVENTS_STREAM_SECONDS < GUNICORN_TIMEOUT
+
+
+def test_procfile_workers_can_hold_streams_open():
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Procfile')) as f:
+        assert '-k gthread' in f.read()
+
+
+def test_stream_of_running_job_ends_and_asks_to_reconnect(monkeypatch):
+    monkeypatch.setattr(app, 'JOB_EVENTS_STREAM_SECONDS', 1.5)
+    job_id = app.job_store.create('search', {'what': 'plumber', 'where': 'Dublin'})
+    app.job_store.mark_running(job_id)
+
+    started = time.time()
+    response = app.app.test_client().get(f'/jobs/{job_id}/events')
+    body = b''.join(response.response).decode()
+    elapsed = time.time() - started
+
+    assert response.status_code == 200
+    assert body.startswith('retry: ')
+    assert 'event: done' not in body
+    assert elapsed < 1.5 + 2  # One poll interval of slack
+
+
+def test_stream_of_finished_job_ends_at_once():
+    job_id = app.job_store.create('search', {'what': 'plumber', 'where': 'Dublin'})
+    app.job_store.mark_completed(job_id, {'filename': None, 'message': 'No businesses found'})
+
+    started = time.time()
+    response = app.app.test_client().get(f'/jobs/{job_id}/events')
+    body = b''.join(response.response).decode()
+
+    assert 'event: done' in body
+    assert time.time() - started < 1
@@ -0,0 +1,148 @@
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+
+import frontier
+import job_queue
+from frontier import ScratchDir, sweep_scratch_dirs
+from journal import ScrapeJournal, sweep_journals
+from job_queue import JobQueue, JobStore, QueueFullError, COMPLETED, FAILED, QUEUED
+
+
+def test_job_waiting_for_a_worker_is_not_taken_for_an_interrupted_one(monkeypatch):
+    monkeypatch.setattr(job_queue, 'JOB_STALE_AFTER', 1)
+    store = JobStore(os.path.join(tempfile.mkdtemp(prefix='gemleads-test-'), 'jobs.sqlite3'))
+    queue = JobQueue(store, max_workers=1, heartbeat_interval=0.2)
+    release = threading.Event()
+    queue.register('search', lambda job_id, **params: release.wait(10) and {})
+
+    try:
+        busy = queue.submit('search', {'what': 'a'}, query_key='a')
+        waiting = queue.submit('search', {'what': 'b'}, query_key='b')
+        time.sleep(1.5)  # Longer than JOB_STALE_AFTER
+
+        assert store.get(waiting)['status'] == QUEUED
+        assert not store.requeue(waiting)  # Resuming would start a second run
+        assert queue.submit('search', {'what': 'b'}, query_key='b') == waiting
+        assert store.get(busy)['status'] == 'running'
+    finally:
+        release.set()
+
+
+def test_scratch_of_a_stale_running_job_is_swept(tmp_path, monkeypatch):
+    monkeypatch.setattr(frontier, 'FRONTIER_DIR', str(tmp_path / 'frontiers'))
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+    live = store.create('sitemap', {})
+    store.mark_running(live)
+    dead = store.create('sitemap', {})
+    store.mark_running(dead)
+    ScratchDir(live), ScratchDir(dead)
+
+    monkeypatch.setattr(job_queue, 'JOB_STALE_AFTER', 60)
+    with store._connect() as conn:  # The worker running it died an hour ago
+        conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time() - 3600, dead))
+
+    assert store.is_live(live) and not store.is_live(dead)
+    sweep_scratch_dirs(store.is_live)
+    assert os.listdir(tmp_path / 'frontiers') == [live]
+
+
+def test_journals_are_kept_only_while_their_job_can_be_resumed(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+    running, completed, failed, old = (store.create('search', {}) for _ in range(4))
+    store.mark_running(running)
+    store.mark_completed(completed, {'filename': None, 'message': 'No businesses found'})
+    store.mark_failed(failed, 'Connection reset')
+    store.mark_failed(old, 'Connection reset')
+    with store._connect() as conn:
+        conn.execute("UPDATE jobs SET finished_at = ? WHERE id = ?", (time.time() - 3600, old))
+    for job_id in (running, completed, failed, old, 'deleted-job'):
+        ScrapeJournal.for_job(job_id, str(tmp_path / 'journals')).page_done(1, None)
+
+    sweep_journals(lambda job_id: store.is_resumable(job_id, 60), str(tmp_path / 'journals'))
+
+    assert sorted(os.listdir(tmp_path / 'journals')) == sorted([f"{running}.jsonl", f"{failed}.jsonl"])
+
+
+def wait_for_status(store, job_id, status, timeout=5):
+    deadline = time.time() + timeout
+    while store.get(job_id)['status'] != status and time.time() < deadline:
+        time.sleep(0.02)
+    return store.get(job_id)
+
+
+def test_jobs_run_in_the_background_and_report_their_outcome(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+    queue = JobQueue(store, max_workers=1)
+    queue.register('search', lambda job_id, what: {'filename': f"{what}.csv"})
+    queue.register('broken', lambda job_id: 1 / 0)
+
+    done = wait_for_status(store, queue.submit('search', {'what': 'plumber'}), COMPLETED)
+    failed = wait_for_status(store, queue.submit('broken', {}), FAILED)
+
+    assert done['result'] == {'filename': 'plumber.csv'}
+    assert done['started_at'] <= done['finished_at']
+    assert 'division by zero' in failed['error']
+    with pytest.raises(KeyError):
+        queue.submit('unknown', {})
+
+
+def test_full_queue_refuses_new_jobs_until_one_finishes(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+    queue = JobQueue(store, max_workers=1, max_jobs=2)
+    release = threading.Event()
+    queue.register('search', lambda job_id, **params: release.wait(10) and {})
+
+    first = queue.submit('search', {'what': 'a'})
+    queue.submit('search', {'what': 'b'})
+    with pytest.raises(QueueFullError):
+        queue.submit('search', {'what': 'c'})
+
+    release.set()
+    wait_for_status(store, first, COMPLETED)
+    time.sleep(0.1)  # The slot is released once the job's worker returns
+    assert queue.submit('search', {'what': 'c'})
+
+
+def test_identical_searches_share_one_job(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+    queue = JobQueue(store, max_workers=1)
+    release = threading.Event()
+    runs = []
+    queue.register('search', lambda job_id, **params: runs.append(job_id) or release.wait(10) and {})
+
+    first = queue.submit('search', {'what': 'plumber'}, query_key='plumber|dublin')
+    assert queue.submit('search', {'what': 'Plumber '}, query_key='plumber|dublin') == first
+    other = queue.submit('search', {'what': 'plumber'}, query_key='plumber|cork')
+    assert other != first
+
+    release.set()
+    wait_for_status(store, first, COMPLETED)
+    wait_for_status(store, other, COMPLETED)
+    assert runs == [first, other]
+    # A finished job is not attached to; repeats are served from find_result()
+    assert queue.submit('search', {'what': 'plumber'}, query_key='plumber|dublin') != first
+
+
+def test_concurrent_processes_coalesce_through_the_store(tmp_path):
+    path = str(tmp_path / 'jobs.sqlite3')
+    JobStore(path)  # Create the schema before the race
+    start = threading.Barrier(8)
+    results = []
+
+    def create():
+        store = JobStore(path)  # One connection per "process"
+        start.wait()
+        results.append(store.create_or_attach('search', {'what': 'plumber'}, 'plumber|dublin'))
+
+    threads = [threading.Thread(target=create) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({job_id for job_id, _ in results}) == 1
+    assert sum(created for _, created in results) == 1
@@ -0,0 +1,21 @@
+from extractors import extract_details
+from recognizers import recognizer
+
+
+def test_prose_at_a_website_is_not_an_email():
+    assert recognizer.scan('Visit us at www.example.ie for more') == ([], [])
+    assert recognizer.find_emails('Visit us at www.example.ie for more', large=True) == []
+
+
+def test_contact_block_with_website_exports_no_email():
+    page = b'<html><body><h1>Acme</h1><div class="contact-info">Phone 01 234 5678. Visit us at www.acme.ie</div></body></html>'
+    details = extract_details(page)
+    assert 'email' not in details
+    assert details['phone'] == '01 234 5678'
+
+
+def test_obfuscated_emails_are_still_found():
+    assert recognizer.find_emails('john at acme dot ie') == ['john@acme.ie']
+    assert recognizer.find_emails('mail john [at] acme.ie') == ['john@acme.ie']
+    assert recognizer.find_emails('sales (at) acme (dot) com') == ['sales@acme.com']
+    assert recognizer.find_emails('info@acme.ie') == ['info@acme.ie']
@@ -0,0 +1,33 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read at import time, so keep the job store out of ~/.gemleads
+os.environ.setdefault('GEMLEADS_DATA_DIR', tempfile.mkdtemp(prefix='gemleads-test-'))
+os.environ.setdefault('GEMLEADS_DOWNLOADS_DIR', os.path.join(os.environ['GEMLEADS_DATA_DIR'], 'downloads'))
+
+from records import COLUMNS, select_columns  # noqa: E402
+
+
+def test_projection_keeps_column_order():
+    assert select_columns('location, Name ,phone') == ['name', 'phone', 'location']
+    assert select_columns(['email']) == ['email']
+    assert select_columns(None) == select_columns('') == COLUMNS
+
+
+@pytest.mark.parametrize('fields', [5, {'name': True}, ['name', 3], 'name, fax'])
+def test_bad_projection_is_a_value_error(fields):
+    with pytest.raises(ValueError):
+        select_columns(fields)
+
+
+@pytest.mark.parametrize('fields', [5, {'name': True}, ['name', None]])
+def test_search_with_malformed_fields_is_a_bad_request(fields):
+    import app
+
+    response = app.app.test_client().post('/search_businesses', json={
+        'what': 'plumber', 'where': 'Dublin', 'fields': fields
+    })
+    assert response.status_code == 400
+    assert 'fields' in response.get_json()['error']
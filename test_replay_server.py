@@ -0,0 +1,24 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.synthetic_site import SyntheticSite
+from replay_server import ReplayServer
+
+
+def test_concurrent_requests_are_all_counted():
+    site = SyntheticSite(listings=20)
+    server = ReplayServer(site, latency=0.01)
+    base_url = server.start()
+    try:
+        urls = [f"{base_url}{path}" for path in site.detail_paths()] * 5
+        with ThreadPoolExecutor(16) as pool:
+            statuses = list(pool.map(lambda url: requests.get(url).status_code, urls))
+
+        assert statuses == [200] * len(urls)
+        assert server.requests_served == len(server.request_times) == len(urls)
+
+        server.reset_stats()
+        assert server.requests_served == 0 and server.request_times == []
+    finally:
+        server.stop()